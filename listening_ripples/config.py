@@ -56,6 +56,8 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "123456"
     POSTGRES_DB: str = "listening_ripples"
+    # 本应用连接的 application_name，简报水位线据此只看本应用的事务
+    POSTGRES_APPLICATION_NAME: str = "listening-ripples"
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -91,6 +93,59 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # 用户自动补全：内存前缀树只缓存热点用户
+    USER_SEARCH_TRIE_ENABLED: bool = False
+    USER_SEARCH_TRIE_MAX_USERS: int = 100_000
+
+    # 监测帖子：按 published_at 范围分区，过期分区整体删除或分离
+    POST_PARTITION_INTERVAL: Literal["day", "week"] = "day"
+    POST_PARTITION_PRECREATE: int = 7
+    POST_RETENTION_DAYS: int = 90
+    POST_RETENTION_MODE: Literal["drop", "detach"] = "drop"
+    POST_PARTITION_MAINTENANCE_SECONDS: int = 60 * 60
+    # 创建/删除分区需要父表上的排他锁；等待超过该时长就放弃并稍后重试，
+    # 避免排队中的排他锁把后续所有读写都堵在它后面
+    POST_PARTITION_LOCK_TIMEOUT_MS: int = 5_000
+    POST_PARTITION_LOCK_RETRIES: int = 3
+
+    # 信源抓取：共享连接池、按主机限流、条件请求与自适应轮询
+    FETCHER_MAX_CONNECTIONS: int = 200
+    FETCHER_PER_HOST_CONCURRENCY: int = 4
+    FETCHER_PER_HOST_RATE: float = 2.0
+    FETCHER_TIMEOUT_SECONDS: float = 15.0
+    FETCHER_MIN_INTERVAL_SECONDS: float = 60.0
+    FETCHER_MAX_INTERVAL_SECONDS: float = 6 * 60 * 60
+    FETCHER_USER_AGENT: str = "listening-to-waves-fetcher/1.0"
+
+    # 文本处理：分词词典（compile_dictionary 生成的二进制文件）与繁简转换表
+    TEXT_DICT_PATH: str | None = None
+    TEXT_T2S_PATH: str | None = None
+    # 每个进程文本缓存的容量（按估算字节数），两者之和为文本缓存常驻内存的上界
+    TEXT_NORMALIZE_CACHE_BYTES: int = 64 * 2**20
+    TEXT_SEGMENT_CACHE_BYTES: int = 64 * 2**20
+
+    # 舆情简报：按入库时间水位线增量汇总，后台有限并发渲染
+    REPORT_REFRESH_SECONDS: int = 5 * 60
+    # 水位线落后当前时间的秒数，避免漏掉尚未提交的事务写入的帖子
+    REPORT_WATERMARK_LAG_SECONDS: int = 60
+    # 长事务让水位线停滞超过该秒数时记录告警日志
+    REPORT_WATERMARK_STALL_WARN_SECONDS: int = 15 * 60
+    # 只汇总发布时间在最近 N 天内的帖子（同时保证分区裁剪）
+    REPORT_HORIZON_DAYS: int = 14
+    REPORT_RENDER_CONCURRENCY: int = 8
+    REPORT_TOP_TOPICS: int = 10
+    REPORT_TOP_NEGATIVE_POSTS: int = 10
+    REPORT_NEGATIVE_THRESHOLD: float = -0.3
+
+    # 邮件通知：常驻 SMTP 连接池、按收件人合并告警、有界重试
+    EMAIL_POOL_SIZE: int = 4
+    EMAIL_QUEUE_SIZE: int = 10_000
+    EMAIL_COALESCE_SECONDS: float = 60.0
+    EMAIL_MAX_RETRIES: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 2.0
+    EMAIL_RETRY_QUEUE_SIZE: int = 1_000
+    EMAIL_SEND_TIMEOUT_SECONDS: float = 30.0
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr = "admin@example.com"
     FIRST_SUPERUSER_PASSWORD: str = "123456"
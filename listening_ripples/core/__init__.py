@@ -0,0 +1,7 @@
+from .post_batch import PostBatch, PostBatchBuilder, TextColumn
+
+__all__ = [
+    "PostBatch",
+    "PostBatchBuilder",
+    "TextColumn",
+]
@@ -0,0 +1,405 @@
+"""
+按列存储的帖子批次，用于抓取 -> 归一化/分词 -> 情感打分 -> 入库之间传递的在途帖子。
+
+与 dict / ORM 对象列表相比，一个批次只由十几个大缓冲区组成：
+- 文本列：所有值的 UTF-8 编码拼接为一个连续缓冲区，另有 int64 偏移数组与空值标记
+- 数值列：typed array（发布时间为 UTC 微秒时间戳 int64，得分 float64，ID int32/int64）
+
+因此内存占用接近原始数据大小，且批次中没有逐条的 Python 对象，不会被循环 GC 扫描。
+
+- 切片（batch[a:b]）只创建新的 memoryview，不复制数据
+- 数值列以 memoryview 暴露，可直接 numpy.asarray(batch.column("sentiment_score")) 零拷贝使用
+- to_bytes / from_bytes 为紧凑的二进制格式，用于进程间传递批次；from_bytes 直接引用传入缓冲区
+
+空值约定：sentiment_score 为 NaN、topic_id 为 -1 表示缺失；可空文本列另有空值标记。
+"""
+
+import math
+import struct
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+_MAGIC = b"LRPB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_SECTION = struct.Struct("<Q")
+_ALIGN = 8
+
+_EPOCH = datetime(1970, 1, 1)
+
+# (列名, array 类型码)
+NUMERIC_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("tenant_id", "i"),
+    ("published_at", "q"),
+    ("sentiment_score", "d"),
+    ("topic_id", "i"),
+    ("share_count", "q"),
+)
+# (列名, 是否可空)
+TEXT_COLUMNS: Tuple[Tuple[str, bool], ...] = (
+    ("source", False),
+    ("source_post_id", False),
+    ("author", True),
+    ("title", True),
+    ("content", False),
+    ("url", True),
+)
+
+NO_TOPIC = -1
+
+
+def _to_micros(value: datetime) -> int:
+    if not isinstance(value, datetime):
+        raise TypeError(f"published_at must be a datetime, got {type(value).__name__}")
+    # 与数据库一致，按不带时区的 UTC 时间存储
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGN
+
+
+class TextColumn:
+    """文本列：连续 UTF-8 缓冲区 + 偏移数组（n + 1 个）+ 可选空值标记（每行 1 字节）"""
+
+    __slots__ = ("data", "offsets", "nulls")
+
+    def __init__(self, data: memoryview, offsets: memoryview, nulls: Optional[memoryview]):
+        self.data = data
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def slice(self, start: int, stop: int) -> "TextColumn":
+        """零拷贝切片：偏移不重新计算，数据缓冲区与原列共享"""
+        nulls = self.nulls[start:stop] if self.nulls is not None else None
+        return TextColumn(self.data, self.offsets[start:stop + 1], nulls)
+
+    @property
+    def nbytes(self) -> int:
+        """本列引用的文本字节数"""
+        return self.offsets[-1] - self.offsets[0] if len(self.offsets) else 0
+
+
+class PostBatchBuilder:
+    """逐条追加帖子，最后 build() 得到不可变的 PostBatch"""
+
+    def __init__(self):
+        self._numeric = {name: array(typecode) for name, typecode in NUMERIC_COLUMNS}
+        self._text = {name: bytearray() for name, _ in TEXT_COLUMNS}
+        self._offsets = {name: array("q", [0]) for name, _ in TEXT_COLUMNS}
+        self._nulls = {name: bytearray() for name, nullable in TEXT_COLUMNS if nullable}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, post: Union[Mapping[str, Any], Any]) -> None:
+        """
+        追加一条帖子（dict 或 PostCreate 等带 model_dump() 的对象）。
+        字段不合法时抛出异常，构建器保持追加前的状态。
+        """
+        row = post if isinstance(post, Mapping) else post.model_dump()
+        # 先转换并校验所有字段，再统一写入各列
+        score = row.get("sentiment_score")
+        topic_id = row.get("topic_id")
+        numbers = (
+            ("tenant_id", row["tenant_id"]),
+            ("published_at", _to_micros(row["published_at"])),
+            ("sentiment_score", math.nan if score is None else score),
+            ("topic_id", NO_TOPIC if topic_id is None else topic_id),
+            ("share_count", row.get("share_count") or 0),
+        )
+        texts = []
+        for name, nullable in TEXT_COLUMNS:
+            value = row.get(name)
+            if value is None and not nullable:
+                raise ValueError(f"{name} must not be None")
+            texts.append((name, nullable, value is None, value.encode("utf-8") if value else b""))
+
+        try:
+            for name, value in numbers:
+                self._numeric[name].append(value)
+            for name, nullable, is_null, encoded in texts:
+                if nullable:
+                    self._nulls[name].append(is_null)
+                data = self._text[name]
+                data += encoded
+                self._offsets[name].append(len(data))
+        except BaseException:
+            # 类型码越界等写入错误：各列回退到追加前的长度，保持行对齐
+            self._truncate()
+            raise
+        self._size += 1
+
+    def _truncate(self) -> None:
+        size = self._size
+        for values in self._numeric.values():
+            del values[size:]
+        for name, nullable in TEXT_COLUMNS:
+            offsets = self._offsets[name]
+            del offsets[size + 1:]
+            del self._text[name][offsets[-1]:]
+            if nullable:
+                del self._nulls[name][size:]
+
+    def extend(self, posts: Iterable[Union[Mapping[str, Any], Any]]) -> None:
+        """追加多条帖子"""
+        for post in posts:
+            self.append(post)
+
+    def build(self) -> "PostBatch":
+        """生成批次；之后构建器会被清空，可以继续复用"""
+        numeric = {name: memoryview(values) for name, values in self._numeric.items()}
+        text = {
+            name: TextColumn(
+                memoryview(bytes(self._text[name])),
+                memoryview(self._offsets[name]),
+                memoryview(bytes(self._nulls[name])) if nullable else None,
+            )
+            for name, nullable in TEXT_COLUMNS
+        }
+        batch = PostBatch(self._size, numeric, text)
+        self.__init__()
+        return batch
+
+
+class PostBatch:
+    """不可变的按列存储帖子批次"""
+
+    __slots__ = ("_size", "_numeric", "_text", "_owner")
+
+    def __init__(
+            self,
+            size: int,
+            numeric: Dict[str, memoryview],
+            text: Dict[str, TextColumn],
+            owner: Any = None,
+    ):
+        self._size = size
+        self._numeric = numeric
+        self._text = text
+        # 从外部缓冲区反序列化时保持对其的引用
+        self._owner = owner
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Union[Mapping[str, Any], Any]]) -> "PostBatch":
+        """由 dict 或 PostCreate 序列构建批次"""
+        builder = PostBatchBuilder()
+        builder.extend(posts)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union["PostBatch", Dict[str, Any]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                raise ValueError("PostBatch only supports contiguous slices")
+            stop = max(start, stop)
+            return PostBatch(
+                stop - start,
+                {name: values[start:stop] for name, values in self._numeric.items()},
+                {name: column.slice(start, stop) for name, column in self._text.items()},
+                self._owner,
+            )
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("post index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._size):
+            yield self.row(i)
+
+    def column(self, name: str) -> memoryview:
+        """数值列的 memoryview，可直接交给 numpy.asarray / numpy.frombuffer（零拷贝）"""
+        try:
+            return self._numeric[name]
+        except KeyError:
+            raise KeyError(f"{name} is not a numeric column") from None
+
+    def text_column(self, name: str) -> TextColumn:
+        """文本列"""
+        return self._text[name]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """还原第 index 条帖子（与 PostCreate 字段一致的 dict）"""
+        numeric = self._numeric
+        score = numeric["sentiment_score"][index]
+        topic_id = numeric["topic_id"][index]
+        row = {
+            "tenant_id": numeric["tenant_id"][index],
+            "published_at": _from_micros(numeric["published_at"][index]),
+            "sentiment_score": None if score != score else score,
+            "topic_id": None if topic_id == NO_TOPIC else topic_id,
+            "share_count": numeric["share_count"][index],
+        }
+        for name, column in self._text.items():
+            row[name] = column[index]
+        return row
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """还原为 dict 列表（例如写库前）"""
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """批次引用的数据字节数（不含 Python 对象开销）"""
+        total = sum(values.nbytes for values in self._numeric.values())
+        for column in self._text.values():
+            total += column.nbytes + column.offsets.nbytes
+            if column.nulls is not None:
+                total += column.nulls.nbytes
+        return total
+
+    def to_bytes(self) -> bytes:
+        """
+        序列化为二进制：头部之后依次为各数值列，再为各文本列的
+        偏移（从 0 开始）、空值标记（仅可空列）、UTF-8 数据；每段带长度前缀并按 8 字节对齐。
+        """
+        parts = [_HEADER.pack(_MAGIC, _VERSION, self._size)]
+        size = _HEADER.size
+
+        def add(section) -> None:
+            nonlocal size
+            raw = section if isinstance(section, (bytes, bytearray)) else section.cast("B")
+            pad = _padding(size + _SECTION.size)
+            parts.append(_SECTION.pack(len(raw)) + b"\0" * pad)
+            parts.append(raw)
+            size += _SECTION.size + pad + len(raw)
+
+        for name, _ in NUMERIC_COLUMNS:
+            add(self._numeric[name])
+        for name, nullable in TEXT_COLUMNS:
+            column = self._text[name]
+            base = column.offsets[0]
+            offsets = column.offsets if base == 0 else memoryview(array("q", (o - base for o in column.offsets)))
+            add(offsets)
+            if nullable:
+                add(column.nulls)
+            add(column.data[base:column.offsets[-1]])
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, bytearray, memoryview]) -> "PostBatch":
+        """从 to_bytes 的结果还原批次；各列直接引用 buffer，不复制数据"""
+        view = memoryview(buffer).cast("B")
+        magic, version, size = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a serialized PostBatch")
+        offset = _HEADER.size
+
+        def take() -> memoryview:
+            nonlocal offset
+            (length,) = _SECTION.unpack_from(view, offset)
+            offset += _SECTION.size + _padding(offset + _SECTION.size)
+            section = view[offset:offset + length]
+            offset += length
+            return section
+
+        numeric = {name: take().cast(typecode) for name, typecode in NUMERIC_COLUMNS}
+        text = {}
+        for name, nullable in TEXT_COLUMNS:
+            offsets = take().cast("q")
+            nulls = take() if nullable else None
+            text[name] = TextColumn(take(), offsets, nulls)
+        for name, values in numeric.items():
+            if len(values) != size:
+                raise ValueError(f"column {name} has {len(values)} rows, expected {size}")
+        return cls(size, numeric, text, buffer)
+
+
+if __name__ == "__main__":
+    # 基准测试：每条帖子的内存占用与 GC 停顿，对比 dict 列表
+    import gc
+    import random
+    import time
+    import tracemalloc
+
+    rng = random.Random(0)
+    hanzi = [chr(c) for c in range(0x4e00, 0x4e00 + 3500)]
+    now = datetime(2026, 1, 1)
+
+    def _post(i: int) -> Dict[str, Any]:
+        return {
+            "tenant_id": rng.randint(1, 50),
+            "source": rng.choice(("weibo", "wechat", "douyin", "news")),
+            "source_post_id": f"{i:012d}",
+            "published_at": now - timedelta(seconds=rng.randint(0, 86400 * 7)),
+            "author": f"user{rng.randint(0, 100_000)}" if rng.random() < 0.9 else None,
+            "title": None,
+            "content": "".join(rng.choices(hanzi, k=rng.randint(20, 140))),
+            "url": f"https://example.com/p/{i}",
+            "sentiment_score": rng.uniform(-1, 1) if rng.random() < 0.8 else None,
+            "topic_id": rng.randint(1, 200) if rng.random() < 0.7 else None,
+            "share_count": rng.randint(0, 5000),
+        }
+
+    total = 200_000
+    gc_time = [0.0, 0]
+
+    def _on_gc(phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            gc_time.append(time.perf_counter())
+        else:
+            gc_time[0] += time.perf_counter() - gc_time.pop()
+            gc_time[1] += 1
+
+    def _measure(label: str, build) -> Any:
+        # 第一遍计时并统计构建期间的 GC 停顿，第二遍用 tracemalloc 统计批次占用的内存
+        rng.seed(0)
+        gc.collect()
+        gc_time[:] = [0.0, 0]
+        gc.callbacks.append(_on_gc)
+        started = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - started
+        gc.callbacks.remove(_on_gc)
+        pause, collections = gc_time[:2]
+        del result
+
+        rng.seed(0)
+        gc.collect()
+        tracemalloc.start()
+        result = build()
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        t0 = time.perf_counter()
+        gc.collect()
+        full = time.perf_counter() - t0
+        print(f"{label:>10}: {used / total:5.0f} B/post, build {elapsed:.2f}s, "
+              f"{collections} collections / {pause * 1000:.0f}ms GC during build, "
+              f"full collection while held {full * 1000:.1f}ms")
+        return result
+
+    # 两种批次都由同一随机序列生成，测得的内存包括批次持有的全部对象
+    # dict 列表测完即释放，避免影响 PostBatch 的测量
+    _measure("dict list", lambda: [_post(i) for i in range(total)]).clear()
+    batch = _measure("PostBatch", lambda: PostBatch.from_posts(_post(i) for i in range(total)))
+    print(f"PostBatch raw data: {batch.nbytes / total:.0f} B/post")
+
+    t0 = time.perf_counter()
+    payload = batch.to_bytes()
+    t1 = time.perf_counter()
+    restored = PostBatch.from_bytes(payload)
+    t2 = time.perf_counter()
+    print(f"serialize {len(payload) / 2**20:.1f}MiB in {(t1 - t0) * 1000:.1f}ms, "
+          f"deserialize {(t2 - t1) * 1e6:.0f}us (zero-copy)")
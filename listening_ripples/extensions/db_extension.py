@@ -1,8 +1,9 @@
 # db_extension.py (或者可以命名为 database.py)
 
 import asyncio
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base # 仍然使用这个来定义模型
 from sqlalchemy.orm import sessionmaker
@@ -11,18 +12,23 @@ from sqlalchemy.orm import sessionmaker
 # 这是一个全局对象，因为所有模型都会继承它
 Base = declarative_base()
 
+# 事务级 advisory lock 的键，多个 worker 同时启动时串行化建表/建扩展
+_DDL_LOCK_KEY = 730_000
+
 class AsyncSQLAlchemyExtension:
     """
     为 FastAPI 应用管理异步 SQLAlchemy 的扩展。
     负责初始化异步引擎、会话工厂，并提供数据库会话的依赖注入。
     """
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, application_name: Optional[str] = None):
         """
         初始化 AsyncSQLAlchemyExtension。
         Args:
             db_url: 数据库连接字符串 (例如 "sqlite+aiosqlite:///./test.db")。
+            application_name: PostgreSQL 连接的 application_name，便于在 pg_stat_activity 中区分本应用。
         """
-        self.engine = create_async_engine(db_url, echo=True) # echo=True 方便调试
+        connect_args = {"application_name": application_name} if application_name else {}
+        self.engine = create_async_engine(db_url, echo=True, connect_args=connect_args) # echo=True 方便调试
         self.AsyncSessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
@@ -36,6 +42,12 @@ class AsyncSQLAlchemyExtension:
         此方法通常在 FastAPI 应用启动时调用。
         """
         async with self.engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # 多个 worker 并发执行 CREATE EXTENSION / CREATE TABLE 会撞上唯一约束报错，
+                # 先拿锁，后到的进程等前一个提交后再检查，届时都已存在
+                await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _DDL_LOCK_KEY})
+                # 用户搜索的三元组索引 (gin_trgm_ops) 依赖 pg_trgm 扩展
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             # 在异步连接中运行同步的 Base.metadata.create_all
             await conn.run_sync(Base.metadata.create_all)
 
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from listening_ripples.users import api as user_api
+from listening_ripples.reports import api as report_api
 
 api_router = APIRouter()
 
 api_router.include_router(user_api.router)
+api_router.include_router(report_api.router)
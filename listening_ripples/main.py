@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -5,12 +8,55 @@ from starlette.middleware.cors import CORSMiddleware
 
 from initialization import api_router
 from config import settings
+from listening_ripples.users.crud import UserCRUD
+from listening_ripples.users.dependencies import async_db
+from listening_ripples.users.indexes import ensure_search_indexes
+from listening_ripples.users.search import user_search_index
+from listening_ripples.workers.email_dispatcher import notification_dispatcher
+from listening_ripples.workers.post_partitions import PostPartitionMaintainer
+from listening_ripples.workers.report_scheduler import ReportScheduler
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # create_all 只创建分区父表，写入前必须先建好保留期内与预创建的分区
+    await async_db.create_db_and_tables()
+    partition_maintainer = PostPartitionMaintainer(async_db.engine)
+    await partition_maintainer.run_once()
+    partition_task = asyncio.create_task(partition_maintainer.run_forever())
+    # 已有库在后台补建用户搜索索引（CONCURRENTLY，不阻塞启动和线上读写）
+    index_task = asyncio.create_task(ensure_search_indexes(async_db.engine))
+    async with async_db.AsyncSessionLocal() as db:
+        # 超级管理员只在这里创建，注册接口拒绝该邮箱
+        await UserCRUD.ensure_first_superuser(db)
+
+    async def load_hot_users():
+        async with async_db.AsyncSessionLocal() as session:
+            return await UserCRUD.get_recent_users(session, limit=user_search_index.max_users)
+
+    # 自动补全前缀树在后台预热并监听其他进程的用户变更，不在请求中加载
+    search_task = asyncio.create_task(user_search_index.listen(
+        async_db.engine.url.set(drivername="postgresql").render_as_string(hide_password=False),
+        load_hot_users,
+    ))
+    # 邮件在后台发送，接口只负责入队
+    if settings.emails_enabled:
+        notification_dispatcher.start()
+    # 每个 worker 都启动简报调度器，汇总由数据库 advisory lock 保证同一时刻只有一个进程执行
+    report_task = asyncio.create_task(ReportScheduler(async_db.AsyncSessionLocal).run_forever())
+    yield
+    report_task.cancel()
+    partition_task.cancel()
+    search_task.cancel()
+    index_task.cancel()
+    if settings.emails_enabled:
+        await notification_dispatcher.stop()
+
+
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
@@ -18,6 +64,7 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -0,0 +1,73 @@
+# models.py
+
+from datetime import date, datetime, timedelta
+from typing import Tuple
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from listening_ripples.extensions.db_extension import Base
+
+
+def partition_start(day: date, interval: str) -> date:
+    """返回 day 所在分区的起始日期（按周分区从周一开始）"""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def partition_step(interval: str) -> timedelta:
+    """单个分区覆盖的时间跨度"""
+    return timedelta(weeks=1) if interval == "week" else timedelta(days=1)
+
+
+def partition_window(today: date, interval: str, precreate: int, retention_days: int) -> Tuple[datetime, datetime]:
+    """
+    返回分区维护任务保证存在分区的 published_at 区间 [start, end)。
+    超出该区间的帖子没有可写入的分区。
+    """
+    start = partition_start(today - timedelta(days=retention_days), interval)
+    end = partition_start(today, interval) + partition_step(interval) * (precreate + 1)
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+class MonitoredPost(Base):
+    """
+    MonitoredPost 模型，对应数据库中的 'monitored_post' 表。
+    使用 PostgreSQL 原生范围分区（按 published_at 按天或按周），
+    分区的预创建与过期清理由 workers.post_partitions 负责。
+    """
+    __tablename__ = "monitored_post"
+
+    # 分区表的主键/唯一约束必须包含分区键
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='帖子唯一ID')
+    published_at = Column(DateTime, primary_key=True, nullable=False, comment='帖子发布时间，分区键')
+    tenant_id = Column(Integer, nullable=False, comment='所属租户ID')
+    source = Column(String(64), nullable=False, comment='来源标识，例如站点或信源名称')
+    source_post_id = Column(String, nullable=False, comment='帖子在来源中的ID')
+    author = Column(String, nullable=True, comment='作者')
+    title = Column(String, nullable=True, comment='标题')
+    content = Column(Text, nullable=False, comment='正文')
+    url = Column(String, nullable=True, comment='原文链接')
+    sentiment_score = Column(Float, nullable=True, comment='情感得分')
+    topic_id = Column(Integer, nullable=True, comment='话题ID')
+    share_count = Column(Integer, default=0, nullable=False, comment='转发/分享数')
+    # 取事务开始时间并统一存为 UTC（与数据库会话时区无关），报表水位线依赖这一点
+    fetched_at = Column(DateTime, default=func.timezone("UTC", func.now()), nullable=False, comment='抓取入库时间（UTC）')
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "source", "source_post_id", "published_at", name="uq_monitored_post_source_post"),
+        Index("ix_monitored_post_published_at", published_at),
+        Index("ix_monitored_post_tenant_published_at", tenant_id, published_at),
+        # 报表按入库时间水位线增量汇总
+        Index("ix_monitored_post_fetched_at", fetched_at),
+        Index("ix_monitored_post_source_published_at", source, published_at),
+        Index("ix_monitored_post_topic_published_at", topic_id, published_at),
+        {"postgresql_partition_by": "RANGE (published_at)"},
+    )
+
+    def __repr__(self):
+        """
+        定义对象的字符串表示，方便调试。
+        """
+        return f"<MonitoredPost(id={self.id}, source='{self.source}', published_at={self.published_at})>"
@@ -0,0 +1,91 @@
+# models.py
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from listening_ripples.extensions.db_extension import Base
+
+class ReportWatermark(Base):
+    """
+    ReportWatermark 模型，对应数据库中的 'report_watermark' 表。
+    记录汇总任务已经处理到的帖子入库时间（monitored_post.fetched_at，UTC）。
+    """
+    __tablename__ = "report_watermark"
+
+    name = Column(String(64), primary_key=True, comment='水位线名称')
+    watermark = Column(DateTime, nullable=False, comment='已汇总到的入库时间（不含）')
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, comment='最后更新时间')
+
+
+class TenantReportState(Base):
+    """
+    TenantReportState 模型，对应数据库中的 'tenant_report_state' 表。
+    每次有新数据汇总进租户的汇总表时 version 加一，渲染好的报表据此判断是否过期。
+    """
+    __tablename__ = "tenant_report_state"
+
+    tenant_id = Column(Integer, primary_key=True, comment='租户ID')
+    version = Column(BigInteger, default=0, nullable=False, comment='汇总数据版本号')
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, comment='最后更新时间')
+
+
+class DailyReportSummary(Base):
+    """
+    DailyReportSummary 模型，对应数据库中的 'daily_report_summary' 表。
+    按租户、按天的汇总：帖子数、情感得分、负面帖子数以及分享最多的负面帖子。
+    """
+    __tablename__ = "daily_report_summary"
+
+    tenant_id = Column(Integer, primary_key=True, comment='租户ID')
+    day = Column(Date, primary_key=True, comment='发布日期')
+    post_count = Column(Integer, default=0, nullable=False, comment='帖子数')
+    sentiment_sum = Column(Float, default=0, nullable=False, comment='情感得分之和')
+    sentiment_count = Column(Integer, default=0, nullable=False, comment='有情感得分的帖子数')
+    negative_count = Column(Integer, default=0, nullable=False, comment='负面帖子数')
+    top_negative_posts = Column(JSONB, default=list, nullable=False, comment='分享最多的负面帖子')
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, comment='最后更新时间')
+
+
+class DailyTopicSummary(Base):
+    """
+    DailyTopicSummary 模型，对应数据库中的 'daily_topic_summary' 表。
+    按租户、按天、按话题的汇总，topic_id 为 0 表示未归类。
+    """
+    __tablename__ = "daily_topic_summary"
+
+    tenant_id = Column(Integer, primary_key=True, comment='租户ID')
+    day = Column(Date, primary_key=True, comment='发布日期')
+    topic_id = Column(Integer, primary_key=True, comment='话题ID')
+    post_count = Column(Integer, default=0, nullable=False, comment='帖子数')
+    sentiment_sum = Column(Float, default=0, nullable=False, comment='情感得分之和')
+    sentiment_count = Column(Integer, default=0, nullable=False, comment='有情感得分的帖子数')
+    negative_count = Column(Integer, default=0, nullable=False, comment='负面帖子数')
+
+
+class ReportPeriodState(Base):
+    """
+    ReportPeriodState 模型，对应数据库中的 'report_period_state' 表。
+    汇总数据有变化的报表周期；version 大于已渲染报表的 input_version 时需要重新渲染。
+    """
+    __tablename__ = "report_period_state"
+
+    tenant_id = Column(Integer, primary_key=True, comment='租户ID')
+    period = Column(String(16), primary_key=True, comment='报表周期：daily / weekly')
+    period_start = Column(Date, primary_key=True, comment='周期起始日期')
+    version = Column(BigInteger, nullable=False, comment='该周期最近一次变化时的汇总数据版本号')
+
+
+class RenderedReport(Base):
+    """
+    RenderedReport 模型，对应数据库中的 'rendered_report' 表。
+    渲染好的日报/周报；input_version 小于租户当前版本时需要重新渲染。
+    """
+    __tablename__ = "rendered_report"
+
+    tenant_id = Column(Integer, primary_key=True, comment='租户ID')
+    period = Column(String(16), primary_key=True, comment='报表周期：daily / weekly')
+    period_start = Column(Date, primary_key=True, comment='周期起始日期')
+    input_version = Column(BigInteger, nullable=False, comment='渲染时使用的汇总数据版本号')
+    payload = Column(JSONB, nullable=False, comment='报表内容')
+    rendered_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, comment='渲染时间')
@@ -1,7 +1,7 @@
 # models.py
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship, declared_attr, backref
 from sqlalchemy.sql import func
 
@@ -46,6 +46,24 @@ class User(Base):
         primaryjoin="User.changed_by_fk == User.id",
         uselist=False,
     )
+
+    __table_args__ = (
+        # 前缀搜索：lower(col) LIKE 'q%' 走 text_pattern_ops 的 B-tree 索引
+        Index("ix_ab_user_name_prefix", func.lower(name).label("name_lower"),
+              postgresql_ops={"name_lower": "text_pattern_ops"}),
+        Index("ix_ab_user_email_prefix", func.lower(email).label("email_lower"),
+              postgresql_ops={"email_lower": "text_pattern_ops"}),
+        Index("ix_ab_user_phone_number_prefix", phone_number,
+              postgresql_ops={"phone_number": "text_pattern_ops"}),
+        # 子串搜索：ILIKE '%q%' 走 pg_trgm 的 GIN 三元组索引
+        Index("ix_ab_user_name_trgm", name, postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_ab_user_email_trgm", email, postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_ab_user_phone_number_trgm", phone_number, postgresql_using="gin",
+              postgresql_ops={"phone_number": "gin_trgm_ops"}),
+    )
+
     # 如果用户可以有其他关联的实体，可以在这里使用 relationship 定义关系。
     # 例如：
     # items = relationship("Item", back_populates="owner")
@@ -0,0 +1,8 @@
+from .schemas import PostCreate, PostResponse
+from .crud import PostCRUD
+
+__all__ = [
+    "PostCreate",
+    "PostResponse",
+    "PostCRUD",
+]
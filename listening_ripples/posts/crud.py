@@ -0,0 +1,105 @@
+import logging
+from datetime import datetime
+from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from listening_ripples.config import settings
+from listening_ripples.models.posts import MonitoredPost, partition_window
+from listening_ripples.posts.schemas import PostCreate
+
+logger = logging.getLogger(__name__)
+
+_INGEST_CHUNK_SIZE = 2000
+
+
+class PostCRUD:
+    """监测帖子CRUD操作类
+
+    所有读取都必须带 published_at 范围，保证 PostgreSQL 只扫描命中的分区。
+    """
+
+    @staticmethod
+    async def ingest_posts(db: AsyncSession, posts: List[PostCreate]) -> int:
+        """批量写入帖子，返回实际写入条数（重复帖子忽略）"""
+        window_start, window_end = partition_window(
+            datetime.utcnow().date(),
+            settings.POST_PARTITION_INTERVAL,
+            settings.POST_PARTITION_PRECREATE,
+            settings.POST_RETENTION_DAYS,
+        )
+        # 超出保留期或预创建范围的帖子没有对应分区，直接丢弃；
+        # 按发布时间排序后，同一分区的行连续写入，分区路由更高效
+        rows = sorted(
+            (
+                post.model_dump()
+                for post in posts
+                if window_start <= post.published_at < window_end
+            ),
+            key=lambda row: row["published_at"],
+        )
+        dropped = len(posts) - len(rows)
+        if dropped:
+            logger.warning(
+                "dropped %d posts published outside the partition window [%s, %s)",
+                dropped, window_start, window_end,
+            )
+        if not rows:
+            return 0
+
+        inserted = 0
+        # 分块写入，避免单条语句超出 PostgreSQL 的绑定参数上限
+        for i in range(0, len(rows), _INGEST_CHUNK_SIZE):
+            stmt = insert(MonitoredPost).values(rows[i:i + _INGEST_CHUNK_SIZE]).on_conflict_do_nothing(
+                constraint="uq_monitored_post_source_post"
+            )
+            result = await db.execute(stmt)
+            inserted += result.rowcount
+        await db.commit()
+        return inserted
+
+    @staticmethod
+    async def get_posts(
+            db: AsyncSession,
+            start: datetime,
+            end: datetime,
+            tenant_id: Optional[int] = None,
+            source: Optional[str] = None,
+            topic_id: Optional[int] = None,
+            skip: int = 0,
+            limit: int = 100
+    ) -> List[MonitoredPost]:
+        """获取 [start, end) 时间范围内的帖子，按发布时间倒序"""
+        query = select(MonitoredPost).where(
+            MonitoredPost.published_at >= start,
+            MonitoredPost.published_at < end,
+        )
+        if tenant_id is not None:
+            query = query.where(MonitoredPost.tenant_id == tenant_id)
+        if source:
+            query = query.where(MonitoredPost.source == source)
+        if topic_id is not None:
+            query = query.where(MonitoredPost.topic_id == topic_id)
+        query = query.order_by(MonitoredPost.published_at.desc()).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def count_posts(
+            db: AsyncSession,
+            start: datetime,
+            end: datetime,
+            tenant_id: Optional[int] = None,
+            source: Optional[str] = None
+    ) -> int:
+        """统计 [start, end) 时间范围内的帖子数"""
+        query = select(func.count()).select_from(MonitoredPost).where(
+            MonitoredPost.published_at >= start,
+            MonitoredPost.published_at < end,
+        )
+        if tenant_id is not None:
+            query = query.where(MonitoredPost.tenant_id == tenant_id)
+        if source:
+            query = query.where(MonitoredPost.source == source)
+        result = await db.execute(query)
+        return result.scalar_one()
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+
+class PostBase(BaseModel):
+    """监测帖子基础模型"""
+    tenant_id: int
+    source: str = Field(..., max_length=64, description="来源标识")
+    source_post_id: str
+    published_at: datetime
+    author: Optional[str] = None
+    title: Optional[str] = None
+    content: str
+    url: Optional[str] = None
+    sentiment_score: Optional[float] = None
+    topic_id: Optional[int] = None
+    share_count: int = 0
+
+    @field_validator("published_at")
+    @classmethod
+    def _published_at_to_naive_utc(cls, value: datetime) -> datetime:
+        # 数据库中按不带时区的 UTC 时间存储
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+class PostCreate(PostBase):
+    """监测帖子写入模型"""
+    pass
+
+class PostResponse(PostBase):
+    """监测帖子响应模型"""
+    id: int
+    fetched_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,10 @@
+from .api import router
+from .schemas import ReportResponse
+from .crud import ReportCRUD, period_start_for
+
+__all__ = [
+    "router",
+    "ReportResponse",
+    "ReportCRUD",
+    "period_start_for",
+]
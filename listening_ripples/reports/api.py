@@ -0,0 +1,31 @@
+from datetime import date, datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from listening_ripples.reports.schemas import ReportResponse
+from listening_ripples.reports.crud import ReportCRUD, period_start_for
+from listening_ripples.users.dependencies import get_db, get_current_active_superuser
+from listening_ripples.models.users import User
+
+# 创建路由器
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/{tenant_id}/{period}", response_model=ReportResponse)
+async def get_report(
+        tenant_id: int,
+        period: Literal["daily", "weekly"],
+        day: Optional[date] = Query(None, description="报表周期内的任意日期，默认今天"),
+        current_user: User = Depends(get_current_active_superuser),
+        db: AsyncSession = Depends(get_db)
+):
+    """获取渲染好的日报/周报（用户尚未关联租户，暂时只允许超级管理员访问）"""
+    period_start = period_start_for(period, day or datetime.utcnow().date())
+    report = await ReportCRUD.get_report(db, tenant_id, period, period_start)
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    return report
@@ -0,0 +1,386 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case, cast, text, and_, Date, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from listening_ripples.config import settings
+from listening_ripples.models.posts import MonitoredPost
+from listening_ripples.models.reports import (
+    DailyReportSummary,
+    DailyTopicSummary,
+    RenderedReport,
+    ReportPeriodState,
+    ReportWatermark,
+    TenantReportState,
+)
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAYS = {"daily": 1, "weekly": 7}
+
+_WATERMARK_NAME = "monitored_post"
+_UPSERT_CHUNK_SIZE = 2000
+# 事务级 advisory lock 的键，保证同一时刻只有一个进程在汇总
+_FOLD_LOCK_KEY = 730_001
+
+# 数据库当前的 UTC 时间，以及其他进行中事务里最早的开始时间（UTC）。
+# fetched_at 取插入事务的开始时间，尚未提交的帖子的 fetched_at 不会早于后者。
+# 应用需使用同一数据库角色（或具有 pg_read_all_stats），否则看不到其他会话的 xact_start。
+# 只看本应用（POSTGRES_APPLICATION_NAME）的客户端连接：autovacuum、备份、
+# 其他应用的长事务不会写帖子，不应卡住水位线。
+_CLOCK_QUERY = text(
+    "SELECT timezone('UTC', now()) AS now, "
+    "(SELECT timezone('UTC', min(xact_start)) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND xact_start IS NOT NULL "
+    "AND backend_type = 'client backend' AND application_name = :application_name "
+    "AND pid <> pg_backend_pid()) AS oldest_xact"
+)
+
+
+def period_start_for(period: str, day: date) -> date:
+    """返回 day 所在报表周期的起始日期（周报从周一开始）"""
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _chunks(rows: List[dict]):
+    for i in range(0, len(rows), _UPSERT_CHUNK_SIZE):
+        yield rows[i:i + _UPSERT_CHUNK_SIZE]
+
+
+def _merge_top_posts(*post_lists: List[dict]) -> List[dict]:
+    """合并多组负面帖子，按分享数保留前 N 条（同一帖子取最新值）"""
+    merged = {}
+    for posts in post_lists:
+        for post in posts:
+            merged[post["id"]] = post
+    ranked = sorted(merged.values(), key=lambda post: post["share_count"], reverse=True)
+    return ranked[:settings.REPORT_TOP_NEGATIVE_POSTS]
+
+
+def _average(total: float, count: int) -> Optional[float]:
+    return total / count if count else None
+
+
+class ReportCRUD:
+    """舆情简报CRUD操作类"""
+
+    @staticmethod
+    async def fold_new_posts(db: AsyncSession) -> Optional[List[Tuple[int, date]]]:
+        """
+        把水位线之后入库的帖子增量汇总进各租户的日汇总表，返回数据有变化的 (租户, 天)。
+        其他进程正在汇总时直接返回 None。
+        """
+        locked = (await db.execute(select(func.pg_try_advisory_xact_lock(_FOLD_LOCK_KEY)))).scalar()
+        if not locked:
+            await db.rollback()
+            return None
+
+        # 水位线上界取自数据库时钟，并且不超过仍在进行中的事务的开始时间，
+        # 保证上界之前入库的帖子都已提交
+        clock = (await db.execute(
+            _CLOCK_QUERY, {"application_name": settings.POSTGRES_APPLICATION_NAME}
+        )).one()
+        now = clock.now
+        upper = now - timedelta(seconds=settings.REPORT_WATERMARK_LAG_SECONDS)
+        if clock.oldest_xact is not None:
+            if now - clock.oldest_xact > timedelta(seconds=settings.REPORT_WATERMARK_STALL_WARN_SECONDS):
+                logger.warning(
+                    "report watermark pinned at %s by a transaction open since then; "
+                    "check pg_stat_activity for application_name=%r",
+                    clock.oldest_xact, settings.POSTGRES_APPLICATION_NAME,
+                )
+            upper = min(upper, clock.oldest_xact)
+        horizon = datetime.combine(now.date() - timedelta(days=settings.REPORT_HORIZON_DAYS), time.min)
+
+        result = await db.execute(
+            select(ReportWatermark.watermark).where(ReportWatermark.name == _WATERMARK_NAME)
+        )
+        lower = result.scalar_one_or_none() or horizon
+        if lower >= upper:
+            await db.rollback()
+            return []
+
+        # 同时限定 published_at，保证只扫描最近的分区
+        window = (
+            MonitoredPost.fetched_at >= lower,
+            MonitoredPost.fetched_at < upper,
+            MonitoredPost.published_at >= horizon,
+        )
+        day = cast(MonitoredPost.published_at, Date)
+        topic_id = func.coalesce(MonitoredPost.topic_id, 0)
+        is_negative = MonitoredPost.sentiment_score <= settings.REPORT_NEGATIVE_THRESHOLD
+
+        topic_rows = (await db.execute(
+            select(
+                MonitoredPost.tenant_id,
+                day.label("day"),
+                topic_id.label("topic_id"),
+                func.count().label("post_count"),
+                func.coalesce(func.sum(MonitoredPost.sentiment_score), 0.0).label("sentiment_sum"),
+                func.count(MonitoredPost.sentiment_score).label("sentiment_count"),
+                func.sum(case((is_negative, 1), else_=0)).label("negative_count"),
+            )
+            .where(*window)
+            .group_by(MonitoredPost.tenant_id, day, topic_id)
+        )).mappings().all()
+
+        ranked = (
+            select(
+                MonitoredPost.id,
+                MonitoredPost.tenant_id,
+                day.label("day"),
+                MonitoredPost.published_at,
+                MonitoredPost.source,
+                MonitoredPost.title,
+                MonitoredPost.url,
+                MonitoredPost.share_count,
+                MonitoredPost.sentiment_score,
+                func.row_number().over(
+                    partition_by=(MonitoredPost.tenant_id, day),
+                    order_by=MonitoredPost.share_count.desc(),
+                ).label("rank"),
+            )
+            .where(*window, is_negative)
+            .subquery()
+        )
+        negative_rows = (await db.execute(
+            select(ranked).where(ranked.c.rank <= settings.REPORT_TOP_NEGATIVE_POSTS)
+        )).mappings().all()
+
+        # 按 (租户, 天) 汇总话题行，并合并已有的负面帖子列表
+        daily: Dict[Tuple[int, date], dict] = {}
+        for row in topic_rows:
+            summary = daily.setdefault((row["tenant_id"], row["day"]), {
+                "tenant_id": row["tenant_id"],
+                "day": row["day"],
+                "post_count": 0,
+                "sentiment_sum": 0.0,
+                "sentiment_count": 0,
+                "negative_count": 0,
+                "top_negative_posts": [],
+            })
+            for key in ("post_count", "sentiment_sum", "sentiment_count", "negative_count"):
+                summary[key] += row[key]
+        for row in negative_rows:
+            daily[(row["tenant_id"], row["day"])]["top_negative_posts"].append({
+                "id": row["id"],
+                "published_at": row["published_at"].isoformat(),
+                "source": row["source"],
+                "title": row["title"],
+                "url": row["url"],
+                "share_count": row["share_count"],
+                "sentiment_score": row["sentiment_score"],
+            })
+
+        if daily:
+            existing = (await db.execute(
+                select(DailyReportSummary.tenant_id, DailyReportSummary.day, DailyReportSummary.top_negative_posts)
+                .where(tuple_(DailyReportSummary.tenant_id, DailyReportSummary.day).in_(list(daily)))
+            )).all()
+            for tenant, summary_day, posts in existing:
+                summary = daily[(tenant, summary_day)]
+                summary["top_negative_posts"] = _merge_top_posts(posts, summary["top_negative_posts"])
+            for summary in daily.values():
+                summary["top_negative_posts"] = _merge_top_posts(summary["top_negative_posts"])
+
+            rows = [dict(row) for row in topic_rows]
+            for chunk in _chunks(rows):
+                stmt = insert(DailyTopicSummary).values(chunk)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=["tenant_id", "day", "topic_id"],
+                    set_={
+                        "post_count": DailyTopicSummary.post_count + stmt.excluded.post_count,
+                        "sentiment_sum": DailyTopicSummary.sentiment_sum + stmt.excluded.sentiment_sum,
+                        "sentiment_count": DailyTopicSummary.sentiment_count + stmt.excluded.sentiment_count,
+                        "negative_count": DailyTopicSummary.negative_count + stmt.excluded.negative_count,
+                    },
+                ))
+
+            for chunk in _chunks(list(daily.values())):
+                stmt = insert(DailyReportSummary).values(chunk)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=["tenant_id", "day"],
+                    set_={
+                        "post_count": DailyReportSummary.post_count + stmt.excluded.post_count,
+                        "sentiment_sum": DailyReportSummary.sentiment_sum + stmt.excluded.sentiment_sum,
+                        "sentiment_count": DailyReportSummary.sentiment_count + stmt.excluded.sentiment_count,
+                        "negative_count": DailyReportSummary.negative_count + stmt.excluded.negative_count,
+                        "top_negative_posts": stmt.excluded.top_negative_posts,
+                        "updated_at": func.now(),
+                    },
+                ))
+
+        tenants = sorted({tenant for tenant, _ in daily})
+        if tenants:
+            stmt = insert(TenantReportState).values([{"tenant_id": t, "version": 1} for t in tenants])
+            versions = dict((await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["tenant_id"],
+                    set_={"version": TenantReportState.version + 1, "updated_at": func.now()},
+                ).returning(TenantReportState.tenant_id, TenantReportState.version)
+            )).all())
+
+            # 标记包含这些天的日报/周报需要重新渲染（包括更早的日期、上一周的周报）
+            periods = {
+                (tenant, period, period_start_for(period, summary_day)): versions[tenant]
+                for tenant, summary_day in daily
+                for period in PERIOD_DAYS
+            }
+            rows = [
+                {"tenant_id": tenant, "period": period, "period_start": start, "version": version}
+                for (tenant, period, start), version in periods.items()
+            ]
+            for chunk in _chunks(rows):
+                stmt = insert(ReportPeriodState).values(chunk)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=["tenant_id", "period", "period_start"],
+                    set_={"version": stmt.excluded.version},
+                ))
+
+        # 超出汇总范围的周期不会再变化
+        await db.execute(delete(ReportPeriodState).where(
+            ReportPeriodState.period_start < horizon.date() - timedelta(days=7)
+        ))
+
+        # 汇总结果与水位线在同一事务中提交，失败时下次从旧水位线重做
+        stmt = insert(ReportWatermark).values(name=_WATERMARK_NAME, watermark=upper)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"watermark": upper, "updated_at": func.now()},
+        ))
+        await db.commit()
+        return sorted(daily)
+
+    @staticmethod
+    async def get_due_reports(db: AsyncSession, today: date) -> List[Tuple[int, str, date, int]]:
+        """
+        返回需要（重新）渲染的报表：(租户, 周期, 起始日期, 汇总数据版本号)。
+        包括输入有变化的任意周期，以及尚未渲染过的本日日报与本周周报。
+        """
+        due = {}
+        changed = (await db.execute(
+            select(
+                ReportPeriodState.tenant_id,
+                ReportPeriodState.period,
+                ReportPeriodState.period_start,
+                ReportPeriodState.version,
+            )
+            .outerjoin(RenderedReport, and_(
+                RenderedReport.tenant_id == ReportPeriodState.tenant_id,
+                RenderedReport.period == ReportPeriodState.period,
+                RenderedReport.period_start == ReportPeriodState.period_start,
+            ))
+            .where(func.coalesce(RenderedReport.input_version, -1) < ReportPeriodState.version)
+        )).all()
+        for tenant_id, period, start, version in changed:
+            due[(tenant_id, period, start)] = version
+
+        # 当前周期即使没有帖子也要有一份（空）报表
+        periods = [("daily", today), ("weekly", period_start_for("weekly", today))]
+        states = (await db.execute(
+            select(TenantReportState.tenant_id, TenantReportState.version)
+            .where(TenantReportState.version > 0)
+        )).all()
+        rendered = {tuple(row) for row in (await db.execute(
+            select(RenderedReport.tenant_id, RenderedReport.period, RenderedReport.period_start)
+            .where(tuple_(RenderedReport.period, RenderedReport.period_start).in_(periods))
+        )).all()}
+        for tenant_id, version in states:
+            for period, start in periods:
+                if (tenant_id, period, start) not in rendered:
+                    due.setdefault((tenant_id, period, start), version)
+        return [(tenant_id, period, start, version) for (tenant_id, period, start), version in sorted(due.items())]
+
+    @staticmethod
+    async def render_report(
+            db: AsyncSession,
+            tenant_id: int,
+            period: str,
+            period_start: date,
+            version: int
+    ) -> None:
+        """根据汇总表渲染一份报表并缓存"""
+        span = timedelta(days=PERIOD_DAYS[period])
+        period_end = period_start + span
+        previous_start = period_start - span
+
+        summaries = (await db.execute(
+            select(DailyReportSummary).where(
+                DailyReportSummary.tenant_id == tenant_id,
+                DailyReportSummary.day >= previous_start,
+                DailyReportSummary.day < period_end,
+            )
+        )).scalars().all()
+        current = [s for s in summaries if s.day >= period_start]
+        previous = [s for s in summaries if s.day < period_start]
+
+        topic_post_count = func.sum(DailyTopicSummary.post_count)
+        topics = (await db.execute(
+            select(
+                DailyTopicSummary.topic_id,
+                topic_post_count.label("post_count"),
+                func.sum(DailyTopicSummary.sentiment_sum).label("sentiment_sum"),
+                func.sum(DailyTopicSummary.sentiment_count).label("sentiment_count"),
+                func.sum(DailyTopicSummary.negative_count).label("negative_count"),
+            )
+            .where(
+                DailyTopicSummary.tenant_id == tenant_id,
+                DailyTopicSummary.day >= period_start,
+                DailyTopicSummary.day < period_end,
+            )
+            .group_by(DailyTopicSummary.topic_id)
+            .order_by(topic_post_count.desc())
+            .limit(settings.REPORT_TOP_TOPICS)
+        )).mappings().all()
+
+        average = _average(sum(s.sentiment_sum for s in current), sum(s.sentiment_count for s in current))
+        previous_average = _average(sum(s.sentiment_sum for s in previous), sum(s.sentiment_count for s in previous))
+        payload = {
+            "period": period,
+            "period_start": period_start.isoformat(),
+            "period_end": period_end.isoformat(),
+            "post_count": sum(s.post_count for s in current),
+            "negative_count": sum(s.negative_count for s in current),
+            "average_sentiment": average,
+            "previous_average_sentiment": previous_average,
+            "sentiment_shift": (
+                average - previous_average
+                if average is not None and previous_average is not None else None
+            ),
+            "top_topics": [
+                {
+                    "topic_id": row["topic_id"],
+                    "post_count": row["post_count"],
+                    "negative_count": row["negative_count"],
+                    "average_sentiment": _average(row["sentiment_sum"], row["sentiment_count"]),
+                }
+                for row in topics
+            ],
+            "top_negative_posts": _merge_top_posts(*(s.top_negative_posts for s in current)),
+        }
+
+        stmt = insert(RenderedReport).values(
+            tenant_id=tenant_id,
+            period=period,
+            period_start=period_start,
+            input_version=version,
+            payload=payload,
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "period", "period_start"],
+            set_={"input_version": version, "payload": payload, "rendered_at": func.now()},
+        ))
+        await db.commit()
+
+    @staticmethod
+    async def get_report(
+            db: AsyncSession,
+            tenant_id: int,
+            period: str,
+            period_start: date
+    ) -> Optional[RenderedReport]:
+        """按主键读取渲染好的报表"""
+        return await db.get(RenderedReport, (tenant_id, period, period_start))
@@ -0,0 +1,15 @@
+from datetime import date, datetime
+from typing import Any, Dict
+from pydantic import BaseModel
+
+class ReportResponse(BaseModel):
+    """舆情简报响应模型"""
+    tenant_id: int
+    period: str
+    period_start: date
+    input_version: int
+    payload: Dict[str, Any]
+    rendered_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,19 +1,27 @@
 from .api import router
-from .schemas import UserCreate, UserLogin, UserResponse, Token
+from .schemas import UserCreate, UserLogin, UserResponse, UserSuggestion, Token
 from .crud import UserCRUD
+from .search import UserPrefixTrie, user_search_index
+from .indexes import SEARCH_INDEX_NAMES, ensure_search_indexes
 from .security import create_access_token, verify_password, get_password_hash
-from .dependencies import get_current_user, get_current_active_user
+from .dependencies import get_current_user, get_current_active_user, get_current_active_superuser
 
 __all__ = [
     "router",
     "UserCreate",
     "UserLogin",
     "UserResponse",
+    "UserSuggestion",
     "Token",
     "UserCRUD",
+    "UserPrefixTrie",
+    "user_search_index",
+    "SEARCH_INDEX_NAMES",
+    "ensure_search_indexes",
     "create_access_token",
     "verify_password",
     "get_password_hash",
     "get_current_user",
-    "get_current_active_user"
+    "get_current_active_user",
+    "get_current_active_superuser"
 ]
\ No newline at end of file
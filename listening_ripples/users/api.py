@@ -1,6 +1,6 @@
 from datetime import timedelta
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from listening_ripples.users.schemas import (
@@ -8,13 +8,21 @@ from listening_ripples.users.schemas import (
     UserLogin,
     UserResponse,
     UserUpdate,
+    UserSuggestion,
     Token
 )
 from listening_ripples.users.crud import UserCRUD
+from listening_ripples.users.search import user_search_index
 from listening_ripples.users.security import verify_password, create_access_token
 from listening_ripples.users.dependencies import get_db, get_current_active_user
 from listening_ripples.models.users import User
 from listening_ripples.config import settings
+from listening_ripples.utilities.http_cache import (
+    make_etag,
+    is_not_modified,
+    set_cache_headers,
+    not_modified_response
+)
 
 # 创建路由器
 router = APIRouter(prefix="/users", tags=["users"])
@@ -26,9 +34,9 @@ async def register_user(
         db: AsyncSession = Depends(get_db)
 ):
     """用户注册"""
-    # 检查邮箱是否已存在
+    # 检查邮箱是否已存在；超级管理员邮箱只能由启动时创建，不允许注册（含大小写变体）
     existing_user = await UserCRUD.get_user_by_email(db, email=user.email)
-    if existing_user:
+    if existing_user or user.email.lower() == settings.FIRST_SUPERUSER.lower():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -87,9 +95,16 @@ async def login_user(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+        request: Request,
+        response: Response,
         current_user: User = Depends(get_current_active_user)
 ):
     """获取当前用户信息"""
+    # 同一 URL 对不同令牌返回不同用户，缓存需按 Authorization 区分
+    etag = make_etag(current_user.id, current_user.updated_at)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, vary="Authorization")
+    set_cache_headers(response, etag, vary="Authorization")
     return current_user
 
 
@@ -120,6 +135,8 @@ async def update_current_user(
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
+        request: Request,
+        response: Response,
         skip: int = Query(0, ge=0, description="跳过的记录数"),
         limit: int = Query(100, ge=1, le=1000, description="返回的记录数"),
         active_only: bool = Query(True, description="只返回活跃用户"),
@@ -127,12 +144,60 @@ async def get_users(
         db: AsyncSession = Depends(get_db)
 ):
     """获取用户列表（需要认证）"""
+    # 先只查询本页的 (id, updated_at) 计算 ETag，未变化时不加载完整记录
+    versions = await UserCRUD.get_user_versions(db, skip=skip, limit=limit, active_only=active_only)
+    etag = make_etag(skip, limit, active_only, versions)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
     users = await UserCRUD.get_users(db, skip=skip, limit=limit, active_only=active_only)
+    set_cache_headers(response, make_etag(skip, limit, active_only, [(u.id, u.updated_at) for u in users]))
+    return users
+
+
+@router.get("/search", response_model=List[UserResponse])
+async def search_users(
+        q: str = Query(..., min_length=1, max_length=100, description="搜索关键字（名称/邮箱/手机号）"),
+        limit: int = Query(20, ge=1, le=100, description="返回的记录数"),
+        active_only: bool = Query(True, description="只返回活跃用户"),
+        current_user: User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_db)
+):
+    """搜索用户（前缀及子串匹配）"""
+    if not q.strip():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Search term must not be blank"
+        )
+    users = await UserCRUD.search_users(db, q, limit=limit, active_only=active_only)
+    return users
+
+
+@router.get("/autocomplete", response_model=List[UserSuggestion])
+async def autocomplete_users(
+        q: str = Query(..., min_length=1, max_length=100, description="输入前缀"),
+        limit: int = Query(10, ge=1, le=50, description="返回的记录数"),
+        current_user: User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_db)
+):
+    """用户自动补全（优先使用内存前缀树，前缀树由后台监听任务预热并接收其他进程的变更）"""
+    if not q.strip():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Search term must not be blank"
+        )
+    if user_search_index.enabled and user_search_index.warmed:
+        suggestions = user_search_index.search(q, limit=limit)
+        # 前缀树只缓存热点用户，结果不足时回退到数据库
+        if len(suggestions) >= limit:
+            return suggestions
+    users = await UserCRUD.search_users(db, q, limit=limit, prefix_only=True)
     return users
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
+        request: Request,
+        response: Response,
         user_id: int,
         current_user: User = Depends(get_current_active_user),
         db: AsyncSession = Depends(get_db)
@@ -144,6 +209,10 @@ async def get_user_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    etag = make_etag(user.id, user.updated_at)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    set_cache_headers(response, etag)
     return user
 
 
@@ -1,12 +1,27 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, or_, func, text
+from sqlalchemy.exc import IntegrityError
+from listening_ripples.config import settings
 from listening_ripples.models.users import User
 from listening_ripples.users.schemas import UserCreate, UserUpdate
+from listening_ripples.users.search import USER_CHANGED_CHANNEL, user_search_index
 from listening_ripples.users.security import get_password_hash
 
 
+def _escape_like(value: str) -> str:
+    """转义 LIKE 通配符"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _notify_user_changed(db: AsyncSession, user_id: int) -> None:
+    """在当前事务中通知其他进程把该用户移出前缀树（事务提交时才送达）"""
+    if user_search_index.enabled:
+        payload = user_search_index.notification_payload(user_id)
+        await db.execute(select(func.pg_notify(USER_CHANGED_CHANNEL, payload)))
+
+
 class UserCRUD:
     """用户CRUD操作类"""
 
@@ -42,6 +57,30 @@ class UserCRUD:
         db.add(db_user)
         await db.commit()
         await db.refresh(db_user)
+        user_search_index.upsert(db_user)
+        return db_user
+
+    @staticmethod
+    async def ensure_first_superuser(db: AsyncSession) -> User:
+        """
+        确保超级管理员账户（FIRST_SUPERUSER / FIRST_SUPERUSER_PASSWORD）存在，应用启动时调用。
+        多个进程同时启动时只有一个能创建成功，其余进程读取已创建的账户。
+        """
+        existing = await UserCRUD.get_user_by_email(db, settings.FIRST_SUPERUSER)
+        if existing is not None:
+            return existing
+        db_user = User(
+            email=settings.FIRST_SUPERUSER,
+            hashed_password=get_password_hash(settings.FIRST_SUPERUSER_PASSWORD),
+        )
+        db.add(db_user)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return await UserCRUD.get_user_by_email(db, settings.FIRST_SUPERUSER)
+        await db.refresh(db_user)
+        user_search_index.upsert(db_user)
         return db_user
 
     @staticmethod
@@ -62,8 +101,12 @@ class UserCRUD:
         await db.execute(
             update(User).where(User.id == user_id).values(**update_data)
         )
+        await _notify_user_changed(db, user_id)
         await db.commit()
-        return await UserCRUD.get_user_by_id(db, user_id)
+        db_user = await UserCRUD.get_user_by_id(db, user_id)
+        if db_user:
+            user_search_index.upsert(db_user)
+        return db_user
 
     @staticmethod
     async def update_login_info(db: AsyncSession, user: User) -> None:
@@ -73,6 +116,7 @@ class UserCRUD:
         user.updated_at = datetime.utcnow()
         await db.commit()
         await db.refresh(user)
+        user_search_index.upsert(user)
 
     @staticmethod
     async def get_users(
@@ -85,7 +129,75 @@ class UserCRUD:
         query = select(User)
         if active_only:
             query = query.where(User.is_active == True)
-        query = query.offset(skip).limit(limit)
+        query = query.order_by(User.id).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_user_versions(
+            db: AsyncSession,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = True
+    ) -> List[Tuple[int, datetime]]:
+        """获取用户列表一页的 (id, updated_at)，用于计算 ETag"""
+        query = select(User.id, User.updated_at)
+        if active_only:
+            query = query.where(User.is_active == True)
+        query = query.order_by(User.id).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    @staticmethod
+    async def search_users(
+            db: AsyncSession,
+            q: str,
+            limit: int = 20,
+            active_only: bool = True,
+            prefix_only: bool = False
+    ) -> List[User]:
+        """
+        按名称、邮箱、手机号搜索用户：先执行走 text_pattern_ops 索引的前缀查询，
+        不足 limit 条时再用三元组索引的子串查询补足（前缀匹配的结果排在前面）。
+        """
+        term = _escape_like(q.strip().lower())
+        if not term:
+            return []
+        base = select(User)
+        if active_only:
+            base = base.where(User.is_active == True)
+
+        prefix_match = or_(
+            func.lower(User.name).like(f"{term}%", escape="\\"),
+            func.lower(User.email).like(f"{term}%", escape="\\"),
+            User.phone_number.like(f"{term}%", escape="\\"),
+        )
+        result = await db.execute(base.where(prefix_match).order_by(User.id).limit(limit))
+        users = list(result.scalars().all())
+        # 三元组索引对少于 3 个字符的关键字无效，短关键字只做前缀匹配
+        if prefix_only or len(term) < 3 or len(users) >= limit:
+            return users
+
+        substring_match = or_(
+            User.name.ilike(f"%{term}%", escape="\\"),
+            User.email.ilike(f"%{term}%", escape="\\"),
+            User.phone_number.like(f"%{term}%", escape="\\"),
+        )
+        query = base.where(substring_match)
+        if users:
+            query = query.where(User.id.notin_([user.id for user in users]))
+        result = await db.execute(query.order_by(User.id).limit(limit - len(users)))
+        return users + list(result.scalars().all())
+
+    @staticmethod
+    async def get_recent_users(db: AsyncSession, limit: int = 1000) -> List[User]:
+        """获取最近登录的活跃用户，用于预热自动补全"""
+        query = (
+            select(User)
+            .where(User.is_active == True)
+            .order_by(User.last_login_at.desc().nullslast(), User.id.desc())
+            .limit(limit)
+        )
         result = await db.execute(query)
         return result.scalars().all()
 
@@ -101,4 +213,64 @@ class UserCRUD:
         """激活用户账户"""
         return await UserCRUD.update_user(
             db, user_id, UserUpdate(is_active=True)
-        )
\ No newline at end of file
+        )
+
+
+async def _benchmark(engine, total: int = 1_000_000, queries: int = 200) -> None:
+    """ab_user 100 万行时搜索与自动补全查询的延迟（在独立 schema 中建表，不影响业务数据）"""
+    import random
+    import time
+
+    from sqlalchemy.orm import sessionmaker
+
+    schema = "bench_user_search"
+    bench_engine = engine.execution_options(schema_translate_map={None: schema})
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        started = time.perf_counter()
+        async with bench_engine.begin() as conn:
+            # 建表时一并创建与线上相同的前缀（text_pattern_ops）和三元组（gin_trgm_ops）索引
+            await conn.run_sync(User.__table__.create)
+            await conn.execute(text(
+                f"INSERT INTO {schema}.ab_user (email, name, phone_number, hashed_password, "
+                f"is_active, login_count, created_at, updated_at) "
+                f"SELECT substr(md5(i::text), 1, 10) || i || '@example.com', substr(md5((i + 1)::text), 1, 8), "
+                f"'1' || lpad(i::text, 10, '0'), 'x', true, 0, now(), now() "
+                f"FROM generate_series(1, :total) AS i"
+            ), {"total": total})
+            await conn.execute(text(f"ANALYZE {schema}.ab_user"))
+        print(f"load {total} users with indexes: {time.perf_counter() - started:.1f}s")
+
+        rng = random.Random(0)
+        alphabet = "0123456789abcdef"
+        cases = {
+            "autocomplete (prefix, 1-4 chars)": ((1, 4), dict(limit=10, prefix_only=True)),
+            "search (prefix + trigram, 3-6 chars)": ((3, 6), dict(limit=20)),
+        }
+        session_factory = sessionmaker(bind=bench_engine, class_=AsyncSession)
+        for label, ((shortest, longest), kwargs) in cases.items():
+            timings = []
+            async with session_factory() as db:
+                for _ in range(queries):
+                    q = "".join(rng.choices(alphabet, k=rng.randint(shortest, longest)))
+                    t0 = time.perf_counter()
+                    await UserCRUD.search_users(db, q, **kwargs)
+                    timings.append(time.perf_counter() - t0)
+                    db.expunge_all()
+            timings.sort()
+            print(f"{label}: p50={timings[len(timings) // 2] * 1e3:.1f}ms "
+                  f"p95={timings[int(len(timings) * 0.95)] * 1e3:.1f}ms")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    asyncio.run(_benchmark(create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))))
@@ -9,7 +9,9 @@ from listening_ripples.config import settings
 
 # 初始化数据库扩展
 print(settings.SQLALCHEMY_DATABASE_URI)
-async_db = AsyncSQLAlchemyExtension(str(settings.SQLALCHEMY_DATABASE_URI))
+async_db = AsyncSQLAlchemyExtension(
+    str(settings.SQLALCHEMY_DATABASE_URI), application_name=settings.POSTGRES_APPLICATION_NAME
+)
 
 # JWT安全
 security = HTTPBearer()
@@ -52,4 +54,16 @@ async def get_current_active_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
+    return current_user
+
+
+async def get_current_active_superuser(
+        current_user: User = Depends(get_current_active_user)
+) -> User:
+    """获取当前超级管理员（FIRST_SUPERUSER）"""
+    if current_user.email != settings.FIRST_SUPERUSER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
     return current_user
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+ab_user 搜索索引的在线补建。
+
+create_all 只在建表时创建索引，已经存在 ab_user 表的库不会自动得到用户搜索依赖的六个索引。
+这里逐个执行 CREATE INDEX CONCURRENTLY IF NOT EXISTS：不锁表、不阻塞线上读写，可以重复执行。
+CONCURRENTLY 中途失败会留下无效（INVALID）索引，IF NOT EXISTS 会跳过它，因此先删掉无效索引再重建。
+
+应用启动时在后台执行一次；也可以在发布前手动执行：python -m listening_ripples.users.indexes
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateIndex
+
+from listening_ripples.models.users import User
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_NAMES = (
+    "ix_ab_user_name_prefix",
+    "ix_ab_user_email_prefix",
+    "ix_ab_user_phone_number_prefix",
+    "ix_ab_user_name_trgm",
+    "ix_ab_user_email_trgm",
+    "ix_ab_user_phone_number_trgm",
+)
+# 会话级 advisory lock 的键，多个进程同时启动时只有一个进程建索引
+_SEARCH_INDEX_LOCK_KEY = 730_003
+
+_INDEX_STATE_QUERY = text(
+    "SELECT c.relname, i.indisvalid FROM pg_index i "
+    "JOIN pg_class c ON c.oid = i.indexrelid "
+    "WHERE i.indrelid = to_regclass(:table)"
+)
+
+
+def create_index_concurrently_ddl(index, dialect) -> str:
+    """生成 CREATE INDEX CONCURRENTLY IF NOT EXISTS 语句"""
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    # 不能给模型上的 Index 设置 postgresql_concurrently：create_all 在事务中建表，而 CONCURRENTLY 不能在事务中执行
+    return ddl.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY ", 1)
+
+
+async def ensure_search_indexes(engine: AsyncEngine) -> List[str]:
+    """补建缺失或无效的搜索索引，返回本次创建的索引名；其他进程正在补建时直接返回空列表"""
+    indexes = sorted(
+        (index for index in User.__table__.indexes if index.name in SEARCH_INDEX_NAMES),
+        key=lambda index: SEARCH_INDEX_NAMES.index(index.name),
+    )
+    created = []
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        locked = (await conn.execute(select(func.pg_try_advisory_lock(_SEARCH_INDEX_LOCK_KEY)))).scalar()
+        if not locked:
+            return created
+        try:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            result = await conn.execute(_INDEX_STATE_QUERY, {"table": User.__tablename__})
+            valid = dict(result.all())
+            for index in indexes:
+                if valid.get(index.name):
+                    continue
+                if index.name in valid:
+                    logger.warning("dropping invalid index %s before rebuilding it", index.name)
+                    await conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+                logger.info("creating index %s concurrently", index.name)
+                await conn.exec_driver_sql(create_index_concurrently_ddl(index, conn.dialect))
+                created.append(index.name)
+        finally:
+            await conn.execute(select(func.pg_advisory_unlock(_SEARCH_INDEX_LOCK_KEY)))
+    return created
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from listening_ripples.config import settings
+
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(ensure_search_indexes(create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI)))))
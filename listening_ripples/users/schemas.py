@@ -37,6 +37,15 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserSuggestion(BaseModel):
+    """用户自动补全模型"""
+    id: int
+    name: Optional[str] = None
+    email: EmailStr
+
+    class Config:
+        from_attributes = True
+
 class Token(BaseModel):
     """令牌模型"""
     access_token: str
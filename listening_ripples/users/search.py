@@ -0,0 +1,286 @@
+"""
+用户自动补全的内存前缀树。
+
+只缓存热点用户（最近登录/写入的用户），容量由 USER_SEARCH_TRIE_MAX_USERS 控制，
+超出容量时按最近使用顺序淘汰。用户写入（注册、更新、登录）时增量刷新，
+无需整体重建。每个进程各自维护一份，启动时预热，结果不足时由数据库前缀查询补足。
+
+跨进程失效：写入用户信息的事务同时 NOTIFY ab_user_changed（见 UserCRUD），
+每个进程用一条独立连接 LISTEN，收到其他进程的通知后把该用户移出本进程的前缀树，
+因此命中前缀树的补全请求不需要回查数据库。监听连接断开期间可能漏掉通知，
+此时前缀树标记为未预热（请求走数据库），重连后清空并重新预热。
+
+延迟目标：
+- 前缀树补全（进程内，100 万条键）：p99 < 1ms（基准测试见本模块 __main__）
+- 数据库搜索（ab_user 100 万行，三元组/text_pattern_ops 索引）：p95 < 50ms
+  （基准测试：python -m listening_ripples.users.crud；已有库的索引由 users/indexes.py 补建）
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psycopg
+
+from listening_ripples.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 用户信息变更通知的频道，负载为 "<来源进程标识>:<用户ID>"
+USER_CHANGED_CHANNEL = "ab_user_changed"
+
+
+class _TrieNode:
+    # 压缩前缀树（radix tree）节点：边标签存放整段字符串，
+    # 避免每个字符一个节点带来的内存开销
+    __slots__ = ("label", "children", "ids")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ids: Optional[set] = None
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class UserPrefixTrie:
+    """用户前缀树：按名称、邮箱、手机号前缀查找用户"""
+
+    def __init__(self, max_users: int = 100_000, enabled: bool = True):
+        self.max_users = max_users
+        self.enabled = enabled
+        self.warmed = False
+        # 本进程发出的变更通知带上该标识，收到自己的通知时跳过（本进程已经增量刷新过）
+        self.origin = uuid.uuid4().hex
+        self._warm_lock = asyncio.Lock()
+        self._root = _TrieNode()
+        # user_id -> (name, email, 索引键)，顺序即最近使用顺序
+        self._users: "OrderedDict[int, Tuple[Optional[str], str, Tuple[str, ...]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @staticmethod
+    def _keys(user) -> Tuple[str, ...]:
+        keys = {user.email.lower()}
+        if user.name:
+            keys.add(user.name.lower())
+        if user.phone_number:
+            keys.add(user.phone_number)
+        return tuple(keys)
+
+    def _insert_key(self, key: str, user_id: int) -> None:
+        node = self._root
+        while key:
+            child = node.children.get(key[0])
+            if child is None:
+                child = node.children[key[0]] = _TrieNode(key)
+                node = child
+                break
+            common = _common_prefix_length(child.label, key)
+            if common < len(child.label):
+                # 拆分边：child 挂到新的中间节点之下
+                middle = _TrieNode(child.label[:common])
+                child.label = child.label[common:]
+                middle.children[child.label[0]] = child
+                node.children[key[0]] = middle
+                child = middle
+            node = child
+            key = key[common:]
+        if node.ids is None:
+            node.ids = set()
+        node.ids.add(user_id)
+
+    def _remove_key(self, key: str, user_id: int) -> None:
+        path = [self._root]
+        node = self._root
+        while key:
+            node = node.children.get(key[0])
+            if node is None or not key.startswith(node.label):
+                return
+            path.append(node)
+            key = key[len(node.label):]
+        if not node.ids:
+            return
+        node.ids.discard(user_id)
+        if node.ids:
+            return
+        node.ids = None
+        # 自底向上裁剪空节点，并把只剩一个子节点的中间节点合并回去
+        for i in range(len(path) - 1, 0, -1):
+            current, parent = path[i], path[i - 1]
+            if current.ids:
+                break
+            if not current.children:
+                del parent.children[current.label[0]]
+                continue
+            if len(current.children) == 1:
+                (only,) = current.children.values()
+                only.label = current.label + only.label
+                parent.children[only.label[0]] = only
+            break
+
+    def upsert(self, user) -> None:
+        """写入或刷新一个用户；非活跃用户会被移除"""
+        if not self.enabled:
+            return
+        self.remove(user.id)
+        if not user.is_active:
+            return
+        keys = self._keys(user)
+        for key in keys:
+            self._insert_key(key, user.id)
+        self._users[user.id] = (user.name, user.email, keys)
+        while len(self._users) > self.max_users:
+            self.remove(next(iter(self._users)))
+
+    def remove(self, user_id: int) -> None:
+        """从前缀树中移除用户"""
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            self._remove_key(key, user_id)
+
+    def load(self, users: Iterable) -> None:
+        """用热点用户集合预热前缀树"""
+        for user in users:
+            self.upsert(user)
+        self.warmed = True
+
+    async def warm(self, loader: Callable[[], Awaitable[Iterable]]) -> None:
+        """只预热一次；并发调用时等待第一次预热完成"""
+        if not self.enabled or self.warmed:
+            return
+        async with self._warm_lock:
+            if not self.warmed:
+                self.load(await loader())
+
+    def clear(self) -> None:
+        """清空前缀树并标记为未预热"""
+        self.warmed = False
+        self._root = _TrieNode()
+        self._users.clear()
+
+    def notification_payload(self, user_id: int) -> str:
+        """本进程写入用户后发出的变更通知负载"""
+        return f"{self.origin}:{user_id}"
+
+    def apply_notification(self, payload: str) -> None:
+        """处理一条变更通知：其他进程改过的用户移出前缀树，下次由数据库查询给出最新信息"""
+        origin, _, user_id = payload.partition(":")
+        if origin != self.origin and user_id.isdigit():
+            self.remove(int(user_id))
+
+    async def listen(
+            self,
+            conninfo: str,
+            loader: Callable[[], Awaitable[Iterable]],
+            retry_seconds: float = 5.0,
+    ) -> None:
+        """
+        后台任务：LISTEN 用户变更通知并预热前缀树。
+        先 LISTEN 再预热，预热期间到达的通知在预热完成后依次处理，不会漏掉；
+        连接断开后清空前缀树，重连时重新预热。
+        """
+        if not self.enabled:
+            return
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(conninfo, autocommit=True)
+                async with conn:
+                    await conn.execute(f"LISTEN {USER_CHANGED_CHANNEL}")
+                    self.clear()
+                    await self.warm(loader)
+                    async for notify in conn.notifies():
+                        self.apply_notification(notify.payload)
+            except Exception:
+                logger.exception("user change listener failed, retrying in %.0fs", retry_seconds)
+            self.clear()
+            await asyncio.sleep(retry_seconds)
+
+    def search(self, prefix: str, limit: int = 10) -> List[dict]:
+        """按前缀查找用户（深度优先，凑满 limit 即停止，完全匹配优先）"""
+        node = self._root
+        prefix = prefix.strip().lower()
+        while prefix:
+            node = node.children.get(prefix[0])
+            if node is None:
+                return []
+            common = _common_prefix_length(node.label, prefix)
+            if common < len(prefix) and common < len(node.label):
+                return []
+            prefix = prefix[common:]
+
+        found: List[int] = []
+        seen = set()
+        stack = [node]
+        while stack and len(found) < limit:
+            current = stack.pop()
+            for user_id in current.ids or ():
+                if user_id not in seen:
+                    seen.add(user_id)
+                    found.append(user_id)
+                    if len(found) >= limit:
+                        break
+            stack.extend(current.children.values())
+
+        results = []
+        for user_id in found:
+            name, email, _ = self._users[user_id]
+            self._users.move_to_end(user_id)
+            results.append({"id": user_id, "name": name, "email": email})
+        return results
+
+
+# 进程级单例，由 UserCRUD 的写操作增量刷新，由 listen() 接收其他进程的变更
+user_search_index = UserPrefixTrie(
+    max_users=settings.USER_SEARCH_TRIE_MAX_USERS,
+    enabled=settings.USER_SEARCH_TRIE_ENABLED,
+)
+
+
+if __name__ == "__main__":
+    # 基准测试：100 万用户的自动补全延迟
+    import random
+    import string
+    import time
+    from types import SimpleNamespace
+
+    total = 1_000_000
+    trie = UserPrefixTrie(max_users=total)
+    rng = random.Random(0)
+
+    def _word(n):
+        return "".join(rng.choices(string.ascii_lowercase, k=n))
+
+    start = time.perf_counter()
+    trie.load(
+        SimpleNamespace(
+            id=i,
+            name=_word(8),
+            email=f"{_word(10)}@example.com",
+            phone_number=f"1{rng.randrange(10**10):010d}",
+            is_active=True,
+        )
+        for i in range(total)
+    )
+    print(f"load {total} users: {time.perf_counter() - start:.1f}s")
+
+    prefixes = [_word(rng.randint(1, 4)) for _ in range(10_000)]
+    timings = []
+    for prefix in prefixes:
+        t0 = time.perf_counter()
+        trie.search(prefix, limit=10)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    print(f"search p50={timings[len(timings) // 2] * 1e6:.0f}us "
+          f"p99={timings[int(len(timings) * 0.99)] * 1e6:.0f}us")
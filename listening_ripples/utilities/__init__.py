@@ -0,0 +1,15 @@
+# http_cache 依赖 FastAPI，不在这里导出（避免文本处理等纯计算进程引入 FastAPI），
+# 使用时直接从 listening_ripples.utilities.http_cache 导入
+from .dictionary import DictionaryTrie, compile_dictionary, load_dictionary
+from .text import TextNormalizer, Segmenter, TextPipeline, get_text_pipeline, load_t2s_table
+
+__all__ = [
+    "DictionaryTrie",
+    "compile_dictionary",
+    "load_dictionary",
+    "TextNormalizer",
+    "Segmenter",
+    "TextPipeline",
+    "get_text_pipeline",
+    "load_t2s_table",
+]
@@ -0,0 +1,143 @@
+"""
+分词词典：把 jieba 格式的文本词典（每行 "词 词频 [词性]"）编译成扁平化的二进制前缀树，
+运行时通过 mmap 只读映射。
+
+进程 fork 之后各 worker 共享同一份页缓存，词典不会随 worker 数量成倍占用内存。
+
+文件布局（小端）：
+    header      magic, version, node_count, edge_count, min_log_prob
+    log_prob    float64[node_count]       节点为完整词时的对数概率，否则为 NaN
+    edge_start  uint32[node_count + 1]    CSR 格式，节点 n 的边为 [edge_start[n], edge_start[n + 1])
+    edge_char   uint32[edge_count]        边上的字符码位，同一节点内升序
+    edge_child  uint32[edge_count]        边指向的子节点
+"""
+
+import math
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+_MAGIC = b"LRDT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIId")
+
+# 按路径缓存已加载的词典，同一进程内只映射一次
+_loaded: Dict[str, "DictionaryTrie"] = {}
+
+
+def _read_entries(lines: Iterable[str]) -> Iterable[Tuple[str, int]]:
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1].isdigit():
+            yield parts[0], int(parts[1])
+
+
+def compile_dictionary(source_path: str, target_path: str) -> None:
+    """将文本词典编译为可 mmap 的二进制前缀树"""
+    with open(source_path, encoding="utf-8") as f:
+        entries = list(_read_entries(f))
+    compile_entries(entries, target_path)
+
+
+def compile_entries(entries: Iterable[Tuple[str, int]], target_path: str) -> None:
+    """将 (词, 词频) 序列编译为二进制前缀树"""
+    # 先构建字典嵌套的前缀树，再按广度优先顺序展开成数组
+    root: dict = {}
+    frequencies = []
+    for word, freq in entries:
+        if not word or freq <= 0:
+            continue
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = freq
+        frequencies.append(freq)
+
+    total = sum(frequencies) or 1
+    log_total = math.log(total)
+
+    log_prob = array("d")
+    edge_start = array("I")
+    edge_char = array("I")
+    edge_child = array("I")
+
+    queue = deque([root])
+    next_id = 1
+    while queue:
+        node = queue.popleft()
+        freq = node.get(None)
+        log_prob.append(math.log(freq) - log_total if freq else math.nan)
+        edge_start.append(len(edge_char))
+        for ch in sorted(k for k in node if k is not None):
+            edge_char.append(ord(ch))
+            edge_child.append(next_id)
+            next_id += 1
+            queue.append(node[ch])
+    edge_start.append(len(edge_char))
+
+    # 未登录字按最低词频的一半估计
+    min_log_prob = math.log(min(frequencies) / 2) - log_total if frequencies else 0.0
+    with open(target_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(log_prob), len(edge_char), min_log_prob))
+        for arr in (log_prob, edge_start, edge_char, edge_child):
+            if arr.itemsize != {"d": 8, "I": 4}[arr.typecode]:
+                raise RuntimeError("unsupported platform array item size")
+            arr.tofile(f)
+
+
+class DictionaryTrie:
+    """mmap 映射的只读词典前缀树"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, node_count, edge_count, self.min_log_prob = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a compiled dictionary")
+
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+        self._log_prob = view[offset:offset + node_count * 8].cast("d")
+        offset += node_count * 8
+        self._edge_start = view[offset:offset + (node_count + 1) * 4].cast("I")
+        offset += (node_count + 1) * 4
+        self._edge_char = view[offset:offset + edge_count * 4].cast("I")
+        offset += edge_count * 4
+        self._edge_child = view[offset:offset + edge_count * 4].cast("I")
+        self.node_count = node_count
+
+    def child(self, node: int, ch: str) -> int:
+        """返回 node 经字符 ch 到达的子节点，不存在时返回 -1"""
+        lo = self._edge_start[node]
+        hi = self._edge_start[node + 1]
+        if lo == hi:
+            return -1
+        code = ord(ch)
+        i = bisect_left(self._edge_char, code, lo, hi)
+        if i < hi and self._edge_char[i] == code:
+            return self._edge_child[i]
+        return -1
+
+    def log_prob(self, node: int) -> Optional[float]:
+        """节点对应完整词时返回其对数概率，否则返回 None"""
+        value = self._log_prob[node]
+        return None if value != value else value
+
+    def __contains__(self, word: str) -> bool:
+        node = 0
+        for ch in word:
+            node = self.child(node, ch)
+            if node < 0:
+                return False
+        return self.log_prob(node) is not None
+
+
+def load_dictionary(path: str) -> DictionaryTrie:
+    """加载（并缓存）编译好的词典；在 fork worker 之前调用即可让所有 worker 共享映射"""
+    trie = _loaded.get(path)
+    if trie is None:
+        trie = _loaded[path] = DictionaryTrie(path)
+    return trie
@@ -0,0 +1,100 @@
+"""
+HTTP 条件请求（ETag / If-None-Match）辅助函数。
+
+读接口先用廉价的数据（id、updated_at 等）计算强 ETag，命中 If-None-Match 时
+直接返回不带响应体的 304，省去响应模型校验与 JSON 序列化。
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# 已认证接口：只允许私有缓存，每次使用前必须向服务器验证
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """根据若干个值生成强 ETag"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match 是否与当前 ETag 匹配（按 RFC 9110 使用弱比较）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def set_cache_headers(
+        response: Response,
+        etag: str,
+        cache_control: str = DEFAULT_CACHE_CONTROL,
+        vary: Optional[str] = None
+) -> None:
+    """为正常响应设置 ETag 与 Cache-Control"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if vary:
+        response.headers["Vary"] = vary
+
+
+def not_modified_response(
+        etag: str,
+        cache_control: str = DEFAULT_CACHE_CONTROL,
+        vary: Optional[str] = None
+) -> Response:
+    """构造不带响应体的 304 响应"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control, vary)
+    return response
+
+
+if __name__ == "__main__":
+    # 基准测试：重复轮询用户列表时 304 相比完整响应节省的字节与 CPU
+    import time
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from listening_ripples.users.schemas import UserResponse
+
+    now = datetime(2026, 1, 1)
+    users = [
+        SimpleNamespace(
+            id=i, email=f"user{i}@example.com", name=f"user {i}", phone_number=f"1380000{i:04d}",
+            bio="x" * 120, is_active=True, login_count=i, last_login_at=now, created_at=now, updated_at=now,
+        )
+        for i in range(100)
+    ]
+    adapter = TypeAdapter(list[UserResponse])
+    rounds = 2_000
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        body = JSONResponse(jsonable_encoder(adapter.validate_python(users, from_attributes=True))).body
+    full = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        make_etag(0, 100, True, [(u.id, u.updated_at) for u in users])
+    conditional = (time.perf_counter() - started) / rounds
+
+    print(f"100-user page: full response {len(body):,} bytes, {full * 1e6:.0f}us CPU; "
+          f"304 0 bytes, {conditional * 1e6:.0f}us CPU")
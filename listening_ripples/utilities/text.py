@@ -0,0 +1,323 @@
+"""
+中文/中英混合文本的统一归一化与分词，供情感分析、关注词匹配、去重、热词统计共用。
+
+归一化：NFKC 全角/半角折叠、英文小写、繁体转简体、去除 URL 与 @提及、压缩空白。
+分词：中文片段基于词典前缀树构建 DAG，按最大概率路径切分；
+英文单词、数字和 emoji 各自作为独立词。
+
+归一化与中文片段切分结果都有 LRU 缓存（转发内容大量重复）。缓存按估算的字节数限定容量
+（TEXT_NORMALIZE_CACHE_BYTES / TEXT_SEGMENT_CACHE_BYTES，按 sys.getsizeof 估算键、值与条目开销），
+单条超过容量 1/64 的长文本不进缓存；两者之和即每个 worker 文本缓存的常驻内存上界。
+词典本身经 mmap 在 worker 间共享。
+"""
+
+import re
+import sys
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from listening_ripples.config import settings
+from listening_ripples.utilities.dictionary import DictionaryTrie, load_dictionary
+
+# 只匹配 URL 允许的字符；不含 "," 与 "@"，URL 后紧跟的（NFKC 折叠后的）逗号、@提及不会被吞掉
+_URL_RE = re.compile(
+    r"(?:https?://|www\.)[a-z0-9\-._~:/?#\[\]!$&'()*+;=%]*[a-z0-9\-_~/#=&%+]",
+    re.IGNORECASE,
+)
+# 提及名在空白或标点处结束；@ 前为 ASCII 字母数字或 "." 时视为邮箱地址，不是提及
+_MENTION_RE = re.compile(
+    r"(?<![a-z0-9_.])@([^\s!-,./:-@\[-^`{-~\u3000-\u303f\uff01-\uff0f\uff1a-\uff20\u2010-\u2027]*)",
+    re.IGNORECASE,
+)
+# 提及名的最大长度（中文等非 ASCII 字符按 2 计）
+_MENTION_MAX_WEIGHT = 30
+_SPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(
+    r"(?P<cjk>[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+)"
+    r"|(?P<word>[a-z0-9]+(?:['._\-][a-z0-9]+)*)"
+    r"|(?P<emoji>[\U0001f300-\U0001faff\u2600-\u27bf])"
+)
+
+
+def _strip_mention(match: "re.Match[str]") -> str:
+    name = match.group(1)
+    weight = sum(1 if ch < "\x80" else 2 for ch in name)
+    if 0 < weight <= _MENTION_MAX_WEIGHT:
+        return " "
+    # 后面没有分隔符、无法确定提及名的边界时只去掉 @，保留正文
+    return " " + name
+
+
+class _ByteBoundedCache:
+    """按估算字节数限定容量的 LRU 缓存（单参数函数）"""
+
+    # OrderedDict 每个条目（哈希表槽位与链表节点）的大致开销
+    _ENTRY_OVERHEAD = 100
+
+    def __init__(self, func: Callable[[str], Any], max_bytes: int, sizeof: Callable[[str, Any], int]):
+        self._func = func
+        self._sizeof = sizeof
+        self._data: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 64
+        self.current_bytes = 0
+
+    def __call__(self, text: str) -> Any:
+        data = self._data
+        try:
+            data.move_to_end(text)
+            return data[text][0]
+        except KeyError:
+            pass
+        value = self._func(text)
+        size = self._sizeof(text, value) + self._ENTRY_OVERHEAD
+        if size <= self.max_entry_bytes:
+            data[text] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted) = data.popitem(last=False)
+                self.current_bytes -= evicted
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.current_bytes = 0
+
+
+def load_t2s_table(path: str) -> Dict[int, str]:
+    """
+    读取繁简对照表（OpenCC TSCharacters.txt 格式：每行 "繁体<TAB>简体 [其他候选]"），
+    返回可直接用于 str.translate 的映射，只保留单字映射。
+    """
+    table = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and len(parts[0]) == 1:
+                table[ord(parts[0])] = parts[1]
+    return table
+
+
+class TextNormalizer:
+    """文本归一化（带 LRU 缓存）"""
+
+    def __init__(
+            self,
+            t2s_table: Optional[Dict[int, str]] = None,
+            cache_bytes: int = settings.TEXT_NORMALIZE_CACHE_BYTES,
+    ):
+        self.t2s_table = t2s_table or {}
+        self.normalize = _ByteBoundedCache(
+            self._normalize, cache_bytes, lambda key, value: sys.getsizeof(key) + sys.getsizeof(value)
+        )
+
+    def _normalize(self, text: str) -> str:
+        text = unicodedata.normalize("NFKC", text)
+        text = _URL_RE.sub(" ", text)
+        text = _MENTION_RE.sub(_strip_mention, text)
+        text = text.lower()
+        if self.t2s_table:
+            text = text.translate(self.t2s_table)
+        return _SPACE_RE.sub(" ", text).strip()
+
+
+class Segmenter:
+    """基于词典 DAG 与最大概率路径的分词器（带 LRU 缓存）"""
+
+    def __init__(
+            self,
+            dictionary: Optional[DictionaryTrie] = None,
+            cache_bytes: int = settings.TEXT_SEGMENT_CACHE_BYTES,
+    ):
+        self.dictionary = dictionary
+        self._cut_cjk = _ByteBoundedCache(
+            self._cut_cjk_uncached,
+            cache_bytes,
+            lambda key, tokens: sys.getsizeof(key) + sys.getsizeof(tokens) + sum(map(sys.getsizeof, tokens)),
+        )
+
+    def _build_dag(self, sentence: str) -> List[List[Tuple[int, float]]]:
+        """dag[i] 为以 i 开头的所有词：(结束位置, 对数概率)"""
+        trie = self.dictionary
+        n = len(sentence)
+        dag = []
+        for i in range(n):
+            ends = []
+            node = 0
+            for j in range(i, n):
+                node = trie.child(node, sentence[j])
+                if node < 0:
+                    break
+                log_prob = trie.log_prob(node)
+                if log_prob is not None:
+                    ends.append((j, log_prob))
+            if not ends or ends[0][0] != i:
+                # 未登录单字
+                ends.insert(0, (i, trie.min_log_prob))
+            dag.append(ends)
+        return dag
+
+    def _cut_cjk_uncached(self, sentence: str) -> Tuple[str, ...]:
+        if self.dictionary is None or len(sentence) == 1:
+            return tuple(sentence)
+        dag = self._build_dag(sentence)
+        n = len(sentence)
+        # route[i] = (从 i 到句尾的最大对数概率, 以 i 开头的词的结束位置)
+        route = [(0.0, 0)] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            route[i] = max((log_prob + route[j + 1][0], j) for j, log_prob in dag[i])
+        tokens = []
+        i = 0
+        while i < n:
+            j = route[i][1]
+            tokens.append(sentence[i:j + 1])
+            i = j + 1
+        return tuple(tokens)
+
+    def cut(self, text: str) -> List[str]:
+        """对已归一化的文本分词"""
+        tokens = []
+        for match in _TOKEN_RE.finditer(text):
+            if match.lastgroup == "cjk":
+                tokens.extend(self._cut_cjk(match.group()))
+            else:
+                tokens.append(match.group())
+        return tokens
+
+
+class TextPipeline:
+    """归一化 + 分词的共享文本处理流水线"""
+
+    def __init__(
+            self,
+            normalizer: Optional[TextNormalizer] = None,
+            segmenter: Optional[Segmenter] = None,
+    ):
+        self.normalizer = normalizer or TextNormalizer()
+        self.segmenter = segmenter or Segmenter()
+
+    @classmethod
+    def from_settings(cls) -> "TextPipeline":
+        """按配置加载词典与繁简对照表"""
+        dictionary = load_dictionary(settings.TEXT_DICT_PATH) if settings.TEXT_DICT_PATH else None
+        t2s_table = load_t2s_table(settings.TEXT_T2S_PATH) if settings.TEXT_T2S_PATH else None
+        return cls(TextNormalizer(t2s_table), Segmenter(dictionary))
+
+    def normalize(self, text: str) -> str:
+        """归一化单条文本"""
+        return self.normalizer.normalize(text)
+
+    def tokenize(self, text: str) -> List[str]:
+        """归一化并分词单条文本"""
+        return self.segmenter.cut(self.normalizer.normalize(text))
+
+    def tokenize_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        """批量分词，批内重复文本只处理一次"""
+        done: Dict[str, List[str]] = {}
+        results = []
+        for text in texts:
+            tokens = done.get(text)
+            if tokens is None:
+                tokens = done[text] = self.tokenize(text)
+            results.append(tokens)
+        return results
+
+
+_pipeline: Optional[TextPipeline] = None
+
+
+def get_text_pipeline() -> TextPipeline:
+    """进程级共享的文本流水线（按配置懒加载）"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = TextPipeline.from_settings()
+    return _pipeline
+
+
+if __name__ == "__main__":
+    # 基准测试：吞吐（docs/s）与 fork 后每个 worker 的常驻内存
+    import multiprocessing
+    import os
+    import random
+    import tempfile
+    import time
+
+    from listening_ripples.utilities.dictionary import compile_entries
+
+    def _rss_kib() -> Dict[str, int]:
+        # RssAnon 为进程私有内存（缓存等），RssFile 含 mmap 共享的词典页
+        fields = {}
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("RssAnon", "RssFile")):
+                    name, value = line.split(":")
+                    fields[name] = int(value.split()[0])
+        return fields
+
+    rng = random.Random(0)
+    hanzi = [chr(c) for c in range(0x4e00, 0x4e00 + 3500)]
+    word_list = sorted({"".join(rng.choices(hanzi, k=rng.choice((2, 2, 2, 3, 4)))) for _ in range(300_000)})
+
+    def _doc():
+        parts = []
+        for _ in range(rng.randint(5, 30)):
+            roll = rng.random()
+            if roll < 0.7:
+                parts.append(rng.choice(word_list))
+            elif roll < 0.8:
+                parts.append(f" Hello{rng.randint(0, 99)} ")
+            elif roll < 0.85:
+                parts.append("\U0001f600")
+            elif roll < 0.9:
+                parts.append(" https://t.cn/abc ")
+            else:
+                parts.append("\uff0c")
+        return "".join(parts)
+
+    docs = [_doc() for _ in range(20_000)]
+    docs += rng.choices(docs, k=30_000)  # 模拟转发带来的重复
+    rng.shuffle(docs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dict_path = os.path.join(tmp, "dict.bin")
+        # 在子进程中编译，避免编译时的临时内存计入本进程
+        compiler = multiprocessing.get_context("fork").Process(
+            target=compile_entries,
+            args=(((w, rng.randint(1, 10_000)) for w in word_list), dict_path),
+        )
+        compiler.start()
+        compiler.join()
+        print(f"dictionary: {len(word_list)} words, {os.path.getsize(dict_path) / 2**20:.1f}MiB")
+        print(f"cache bounds: normalize={settings.TEXT_NORMALIZE_CACHE_BYTES / 2**20:.0f}MiB, "
+              f"segment={settings.TEXT_SEGMENT_CACHE_BYTES / 2**20:.0f}MiB")
+
+        dictionary = load_dictionary(dict_path)
+
+        def _work(result_queue):
+            before = _rss_kib()
+            pipeline = TextPipeline(segmenter=Segmenter(dictionary))
+            t0 = time.perf_counter()
+            pipeline.tokenize_batch(docs)
+            elapsed = time.perf_counter() - t0
+            after = _rss_kib()
+            result_queue.put(
+                f"pid {os.getpid()}: {len(docs) / elapsed:,.0f} docs/s, "
+                f"private +{(after['RssAnon'] - before['RssAnon']) / 1024:.0f}MiB, "
+                f"file-backed (shared) {after['RssFile'] / 1024:.0f}MiB"
+            )
+
+        ctx = multiprocessing.get_context("fork")
+        for worker_count in (1, 4):
+            queue = ctx.Queue()
+            workers = [ctx.Process(target=_work, args=(queue,)) for _ in range(worker_count)]
+            for worker in workers:
+                worker.start()
+            print(f"{worker_count} worker(s):")
+            for _ in workers:
+                print("  " + queue.get())
+            for worker in workers:
+                worker.join()
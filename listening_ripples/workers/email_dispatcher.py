@@ -0,0 +1,365 @@
+"""
+后台邮件通知分发器。
+
+- 常驻 SMTP 连接池（EMAIL_POOL_SIZE），连接复用，避免每封邮件都重新握手 TLS
+- 接口处理函数只调用 enqueue_*，放入有界队列后立即返回，从不等待发送；
+  可以在事件循环中调用，也可以在同步接口/工作线程中调用（经 call_soon_threadsafe 转交）
+- 未配置 SMTP（settings.emails_enabled 为 False）时 enqueue_* 只记录日志，不入队；
+  发件人/收件人地址不合法的邮件在入队前拒绝
+- 收件人的第一条告警立即发送，之后 EMAIL_COALESCE_SECONDS 内的告警合并为一封摘要邮件
+- 临时性发送失败按指数退避重试，最多 EMAIL_MAX_RETRIES 次；等待重试的邮件数量有上限。
+  永久性失败（5xx，如收件人被拒）和意外异常不重试，记录日志后丢弃
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Dict, List, Optional
+
+import aiosmtplib
+from pydantic import validate_email
+
+from listening_ripples.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _is_valid_address(address: Optional[str]) -> bool:
+    if not address:
+        return False
+    try:
+        validate_email(address)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_permanent_failure(exc: Exception) -> bool:
+    """5xx 回复属于永久性失败，重试也不会成功"""
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in exc.recipients)
+    return isinstance(exc, aiosmtplib.SMTPResponseException) and exc.code >= 500
+
+
+@dataclass
+class Alert:
+    """一条待发送的告警"""
+    subject: str
+    body: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class SMTPConnectionPool:
+    """SMTP 连接池：空闲连接复用，出错的连接直接丢弃"""
+
+    def __init__(self, size: int = settings.EMAIL_POOL_SIZE):
+        self.size = size
+        self._idle: "asyncio.LifoQueue[aiosmtplib.SMTP]" = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            use_tls=settings.SMTP_SSL,
+            start_tls=settings.SMTP_TLS and not settings.SMTP_SSL,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            timeout=settings.EMAIL_SEND_TIMEOUT_SECONDS,
+        )
+        await client.connect()
+        return client
+
+    async def send(self, message: EmailMessage) -> None:
+        """借用一个连接发送邮件，失败时抛出异常"""
+        async with self._slots:
+            client = None
+            while not self._idle.empty():
+                candidate = self._idle.get_nowait()
+                if candidate.is_connected:
+                    client = candidate
+                    break
+            if client is None:
+                client = await self._connect()
+            try:
+                await client.send_message(message)
+            except BaseException:
+                await self._discard(client)
+                raise
+            self._idle.put_nowait(client)
+
+    @staticmethod
+    async def _discard(client: aiosmtplib.SMTP) -> None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """关闭所有空闲连接"""
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            try:
+                await client.quit()
+            except aiosmtplib.SMTPException:
+                client.close()
+
+
+class NotificationDispatcher:
+    """邮件通知分发器"""
+
+    def __init__(
+            self,
+            pool: Optional[SMTPConnectionPool] = None,
+            queue_size: int = settings.EMAIL_QUEUE_SIZE,
+            coalesce_seconds: float = settings.EMAIL_COALESCE_SECONDS,
+            max_retries: int = settings.EMAIL_MAX_RETRIES,
+            retry_base_seconds: float = settings.EMAIL_RETRY_BASE_SECONDS,
+            retry_queue_size: int = settings.EMAIL_RETRY_QUEUE_SIZE,
+    ):
+        self.pool = pool or SMTPConnectionPool()
+        self.coalesce_seconds = coalesce_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_queue_size = retry_queue_size
+        self.sent_count = 0
+        self.dropped_count = 0
+
+        # (邮件, 已尝试次数)
+        self._outbox: "asyncio.Queue[tuple]" = asyncio.Queue(maxsize=queue_size)
+        self._pending_alerts: Dict[str, List[Alert]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        # 等待重试的定时器 -> 邮件
+        self._retry_handles: Dict[asyncio.TimerHandle, EmailMessage] = {}
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def build_message(recipient: str, subject: str, body: str) -> EmailMessage:
+        """构建一封纯文本邮件"""
+        message = EmailMessage()
+        message["From"] = formataddr((settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL))
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    def _on_loop(self) -> Optional[bool]:
+        """当前是否在分发器的事件循环线程中；分发器未启动时返回 None"""
+        if self._loop is None or self._loop.is_closed():
+            return None
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _accepting(self, recipient: Optional[str], sender: Optional[str]) -> Optional[bool]:
+        if not settings.emails_enabled:
+            logger.info("emails disabled, not sending email to %s", recipient)
+            return None
+        if not (_is_valid_address(recipient) and _is_valid_address(sender)):
+            self.dropped_count += 1
+            logger.warning("invalid email address (from %r, to %r), dropping email", sender, recipient)
+            return None
+        on_loop = self._on_loop()
+        if on_loop is None:
+            self.dropped_count += 1
+            logger.warning("email dispatcher not started, dropping email to %s", recipient)
+        return on_loop
+
+    def enqueue_message(self, message: EmailMessage) -> bool:
+        """
+        把邮件放入发送队列（不阻塞），返回是否已受理。
+        地址不合法、或在事件循环中调用且队列已满时丢弃并返回 False；
+        从其他线程调用时转交给事件循环，队列已满的情况只记录日志。
+        """
+        on_loop = self._accepting(message["To"], message["From"])
+        if on_loop is None:
+            return False
+        if not on_loop:
+            self._loop.call_soon_threadsafe(self._put, message, 0)
+            return True
+        return self._put(message, 0)
+
+    def _put(self, message: EmailMessage, attempt: int) -> bool:
+        try:
+            self._outbox.put_nowait((message, attempt))
+        except asyncio.QueueFull:
+            self.dropped_count += 1
+            logger.warning("email queue full, dropping message to %s", message["To"])
+            return False
+        return True
+
+    def enqueue_alert(self, recipient: str, subject: str, body: str) -> None:
+        """登记一条告警；第一条立即发送，合并窗口内的后续告警合并为一封摘要"""
+        on_loop = self._accepting(recipient, settings.EMAILS_FROM_EMAIL)
+        if on_loop is None:
+            return
+        alert = Alert(subject, body)
+        if on_loop:
+            self._add_alert(recipient, alert)
+        else:
+            self._loop.call_soon_threadsafe(self._add_alert, recipient, alert)
+
+    def _add_alert(self, recipient: str, alert: Alert) -> None:
+        if recipient in self._flush_handles:
+            self._pending_alerts.setdefault(recipient, []).append(alert)
+            return
+        # 窗口外的第一条告警不等待，直接发送并开启合并窗口
+        self._put(self.build_message(recipient, alert.subject, alert.body), 0)
+        self._open_window(recipient)
+
+    def _open_window(self, recipient: str) -> None:
+        self._flush_handles[recipient] = self._loop.call_later(
+            self.coalesce_seconds, self._flush_alerts, recipient
+        )
+
+    def _flush_alerts(self, recipient: str, reopen: bool = True) -> None:
+        self._flush_handles.pop(recipient, None)
+        alerts = self._pending_alerts.pop(recipient, [])
+        if not alerts:
+            return
+        # 窗口内仍有告警说明告警还在持续，摘要发出后继续合并下一个窗口
+        if reopen:
+            self._open_window(recipient)
+        if len(alerts) == 1:
+            subject, body = alerts[0].subject, alerts[0].body
+        else:
+            subject = f"[{settings.PROJECT_NAME}] {len(alerts)} 条新告警"
+            body = "\n\n".join(
+                f"{alert.created_at:%Y-%m-%d %H:%M:%S} UTC  {alert.subject}\n{alert.body}"
+                for alert in alerts
+            )
+        self._put(self.build_message(recipient, subject, body), 0)
+
+    def _schedule_retry(self, message: EmailMessage, attempt: int) -> None:
+        if attempt > self.max_retries or len(self._retry_handles) >= self.retry_queue_size:
+            self.dropped_count += 1
+            logger.error("giving up on email to %s after %d attempts", message["To"], attempt)
+            return
+        delay = self.retry_base_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+        def _requeue():
+            self._retry_handles.pop(handle, None)
+            self._put(message, attempt)
+
+        handle = self._loop.call_later(delay, _requeue)
+        self._retry_handles[handle] = message
+
+    async def _worker(self) -> None:
+        while True:
+            message, attempt = await self._outbox.get()
+            try:
+                await self.pool.send(message)
+                self.sent_count += 1
+            except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as exc:
+                if _is_permanent_failure(exc):
+                    self.dropped_count += 1
+                    logger.error("send email to %s rejected, not retrying: %s", message["To"], exc)
+                else:
+                    logger.warning("send email to %s failed (attempt %d): %s", message["To"], attempt + 1, exc)
+                    self._schedule_retry(message, attempt + 1)
+            except Exception:
+                # 任何意外异常都不能让发送协程退出，否则队列再也不会被消费
+                self.dropped_count += 1
+                logger.exception("unexpected error sending email to %s, dropping it", message["To"])
+            finally:
+                self._outbox.task_done()
+
+    def start(self) -> None:
+        """在事件循环中启动发送协程（每个连接槽一个）"""
+        self._loop = asyncio.get_running_loop()
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool.size)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """立即发出合并窗口中的告警，尽量发完队列后关闭连接池"""
+        for recipient in list(self._flush_handles):
+            self._flush_handles[recipient].cancel()
+            self._flush_alerts(recipient, reopen=False)
+        try:
+            await asyncio.wait_for(self._outbox.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("email queue not drained, %d messages left", self._outbox.qsize())
+        for handle, message in self._retry_handles.items():
+            handle.cancel()
+            self.dropped_count += 1
+            logger.warning("dispatcher stopping, dropping pending retry to %s", message["To"])
+        self._retry_handles.clear()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+        await self.pool.close()
+
+
+notification_dispatcher = NotificationDispatcher()
+
+
+if __name__ == "__main__":
+    # 基准测试：本地 aiosmtpd 替身服务器，对比连接池与每封邮件新建连接的吞吐
+    import socket
+    import time
+
+    from aiosmtpd.controller import Controller
+
+    class _CountingHandler:
+        def __init__(self):
+            self.count = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            self.count += 1
+            return "250 OK"
+
+    async def _benchmark(total: int = 2_000) -> None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        handler = _CountingHandler()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        settings.SMTP_HOST = "127.0.0.1"
+        settings.SMTP_PORT = port
+        settings.SMTP_TLS = False
+        settings.SMTP_SSL = False
+        settings.EMAILS_FROM_EMAIL = "alerts@example.com"
+        try:
+            messages = [
+                NotificationDispatcher.build_message(f"user{i}@example.com", f"alert {i}", "body")
+                for i in range(total)
+            ]
+
+            started = time.perf_counter()
+            for message in messages[:total // 10]:
+                await aiosmtplib.send(message, hostname=settings.SMTP_HOST, port=settings.SMTP_PORT)
+            elapsed = time.perf_counter() - started
+            print(f"connection per message: {total // 10 / elapsed:,.0f} msgs/s")
+
+            dispatcher = NotificationDispatcher(queue_size=total)
+            dispatcher.start()
+            started = time.perf_counter()
+            for message in messages:
+                dispatcher.enqueue_message(message)
+            enqueue_elapsed = time.perf_counter() - started
+            await dispatcher._outbox.join()
+            elapsed = time.perf_counter() - started
+            print(f"pooled ({dispatcher.pool.size} connections): {total / elapsed:,.0f} msgs/s, "
+                  f"enqueue {enqueue_elapsed / total * 1e6:.1f}us/msg")
+
+            dispatcher.coalesce_seconds = 0.1
+            before = handler.count
+            for i in range(total):
+                dispatcher.enqueue_alert(f"user{i % 10}@example.com", f"alert {i}", "body")
+            await asyncio.sleep(0.2)
+            await dispatcher._outbox.join()
+            print(f"coalescing: {total} alerts for 10 recipients -> {handler.count - before} emails")
+            await dispatcher.stop()
+        finally:
+            controller.stop()
+
+    asyncio.run(_benchmark())
@@ -0,0 +1,296 @@
+"""
+信源抓取器：轮询 RSS、论坛、新闻站点等公开信源。
+
+- 共享 aiohttp 连接池（keep-alive），全局连接上限 FETCHER_MAX_CONNECTIONS，
+  单主机连接上限 FETCHER_PER_HOST_CONCURRENCY
+- 按主机限制请求速率（令牌桶），避免压垮单个站点
+- 条件请求（ETag / Last-Modified），未变化的信源只消耗一次 304
+- 自适应轮询：内容未变化时间隔翻倍（不超过上限），有变化时间隔减半
+- 有变化的抓取结果写入有界队列 results，由下游入库消费（队列满时自然形成背压）
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from listening_ripples.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchSource:
+    """一个被轮询的信源及其条件请求/调度状态"""
+    url: str
+    interval: float = settings.FETCHER_MIN_INTERVAL_SECONDS
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    next_due: float = 0.0
+    unchanged_count: int = 0
+    error_count: int = 0
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+
+@dataclass
+class FetchResult:
+    """一次有内容变化的抓取结果"""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str]
+    fetched_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class HostRateLimiter:
+    """单个主机的请求速率限制（令牌桶）"""
+
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._capacity = max(1.0, float(burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """取得一个令牌，必要时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class SourceFetcher:
+    """信源抓取器：调度、限流、条件请求并输出有变化的内容"""
+
+    def __init__(
+            self,
+            session: Optional[aiohttp.ClientSession] = None,
+            max_connections: int = settings.FETCHER_MAX_CONNECTIONS,
+            per_host_concurrency: int = settings.FETCHER_PER_HOST_CONCURRENCY,
+            per_host_rate: float = settings.FETCHER_PER_HOST_RATE,
+            min_interval: float = settings.FETCHER_MIN_INTERVAL_SECONDS,
+            max_interval: float = settings.FETCHER_MAX_INTERVAL_SECONDS,
+            queue_size: int = 1000,
+    ):
+        self.session = session
+        self.max_connections = max_connections
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.results: "asyncio.Queue[FetchResult]" = asyncio.Queue(maxsize=queue_size)
+
+        self._limiters: Dict[str, HostRateLimiter] = {}
+        self._sources: Dict[str, FetchSource] = {}
+        # (next_due, 序号, url) 小顶堆；删除信源时只从 _sources 移除，出堆时跳过
+        self._schedule: List = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks: set = set()
+
+    def add_source(self, url: str, interval: Optional[float] = None) -> FetchSource:
+        """添加信源，立即进入调度"""
+        source = self._sources.get(url)
+        if source is None:
+            source = FetchSource(url=url, interval=interval or self.min_interval)
+            self._sources[url] = source
+            self._push(source)
+        return source
+
+    def remove_source(self, url: str) -> None:
+        """移除信源"""
+        self._sources.pop(url, None)
+
+    def _push(self, source: FetchSource) -> None:
+        heapq.heappush(self._schedule, (source.next_due, next(self._counter), source.url))
+        self._wakeup.set()
+
+    def _limiter(self, host: str) -> HostRateLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = HostRateLimiter(self.per_host_rate, self.per_host_concurrency)
+        return limiter
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # ClientSession 需要在事件循环内创建，因此延迟到第一次抓取
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host_concurrency,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.FETCHER_TIMEOUT_SECONDS),
+                headers={"User-Agent": settings.FETCHER_USER_AGENT},
+            )
+        return self.session
+
+    def _reschedule(self, source: FetchSource, changed: bool) -> None:
+        if changed:
+            source.unchanged_count = 0
+            source.interval = max(self.min_interval, source.interval / 2)
+        else:
+            source.unchanged_count += 1
+            source.interval = min(self.max_interval, source.interval * 2)
+        source.next_due = time.monotonic() + source.interval
+        if source.url in self._sources:
+            self._push(source)
+
+    async def fetch(self, source: FetchSource) -> Optional[FetchResult]:
+        """抓取一次信源，内容未变化时返回 None"""
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+
+        await self._limiter(source.host).acquire()
+        async with self._get_session().get(source.url, headers=headers) as response:
+            if response.status == 304:
+                return None
+            response.raise_for_status()
+            content = await response.read()
+
+        source.etag = response.headers.get("ETag", source.etag)
+        source.last_modified = response.headers.get("Last-Modified", source.last_modified)
+        # 不支持条件请求的站点用内容摘要判断是否变化
+        content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if content_hash == source.content_hash:
+            return None
+        source.content_hash = content_hash
+        return FetchResult(
+            url=source.url,
+            status_code=response.status,
+            content=content,
+            headers=dict(response.headers),
+        )
+
+    async def _poll(self, source: FetchSource) -> None:
+        try:
+            result = await self.fetch(source)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+            source.error_count += 1
+            logger.warning("fetch %s failed: %s", source.url, exc)
+            self._reschedule(source, changed=False)
+            return
+        except Exception:
+            # 其他异常（例如响应解码错误）同样退避后重试，不能让信源从调度中消失
+            source.error_count += 1
+            logger.exception("fetch %s failed unexpectedly", source.url)
+            self._reschedule(source, changed=False)
+            return
+        source.error_count = 0
+        if result is not None:
+            await self.results.put(result)
+        self._reschedule(source, changed=result is not None)
+
+    async def run(self) -> None:
+        """调度循环：到期的信源并发抓取"""
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, url = heapq.heappop(self._schedule)
+                source = self._sources.get(url)
+                if source is None:
+                    continue
+                task = asyncio.create_task(self._poll(source))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            timeout = self._schedule[0][0] - now if self._schedule else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        """取消进行中的抓取并关闭连接池"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.session is not None:
+            await self.session.close()
+
+
+async def _serve_stand_in(host: str = "127.0.0.1", port: int = 0, state: Optional[Dict[str, int]] = None):
+    """
+    本地替身 HTTP 服务器：支持 ETag 条件请求和 keep-alive。
+    state["version"] 决定响应内容与 ETag（修改后即视为信源更新），
+    state["requests"] / state["not_modified"] 统计请求数与 304 数。
+    """
+    state = state if state is not None else {}
+    state.setdefault("version", 1)
+    state.setdefault("requests", 0)
+    state.setdefault("not_modified", 0)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                version = state["version"]
+                body = f"<rss><channel><item>stand-in v{version}</item></channel></rss>".encode()
+                etag = f'"stand-in-v{version}"'
+                state["requests"] += 1
+                not_modified = f"if-none-match: {etag}".encode() in head.lower()
+                if not_modified:
+                    state["not_modified"] += 1
+                    writer.write(f"HTTP/1.1 304 Not Modified\r\nETag: {etag}\r\nContent-Length: 0\r\n\r\n".encode())
+                else:
+                    writer.write(
+                        f"HTTP/1.1 200 OK\r\nETag: {etag}\r\nContent-Type: application/rss+xml\r\n"
+                        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                    )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _benchmark(hosts: int = 20, sources_per_host: int = 50, rounds: int = 5) -> None:
+    """抓取吞吐基准：首轮 200，后续轮次全部为 304"""
+    servers = [await _serve_stand_in() for _ in range(hosts)]
+    urls = [
+        f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/feed/{i}"
+        for server in servers
+        for i in range(sources_per_host)
+    ]
+    fetcher = SourceFetcher(per_host_concurrency=8, per_host_rate=1e9, queue_size=len(urls))
+    sources = [fetcher.add_source(url) for url in urls]
+    try:
+        for round_no in range(rounds):
+            started = time.perf_counter()
+            results = await asyncio.gather(*(fetcher.fetch(source) for source in sources))
+            elapsed = time.perf_counter() - started
+            changed = sum(result is not None for result in results)
+            print(f"round {round_no}: {len(urls) / elapsed:,.0f} fetches/s ({changed} changed)")
+    finally:
+        await fetcher.close()
+        for server in servers:
+            server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
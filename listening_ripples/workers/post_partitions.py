@@ -0,0 +1,244 @@
+"""
+监测帖子分区维护任务。
+
+- 预创建未来 POST_PARTITION_PRECREATE 个周期的分区，并补齐保留期内缺失的分区
+- 超出 POST_RETENTION_DAYS 的分区整体 DROP（或 DETACH 后留作归档），
+  不对大表执行 DELETE，避免表膨胀和 VACUUM 压力
+- DDL 设置 lock_timeout（POST_PARTITION_LOCK_TIMEOUT_MS），父表上有长查询时放弃等待并稍后重试，
+  不让排队中的排他锁阻塞线上读写
+
+注意：修改 POST_PARTITION_INTERVAL 后新旧分区范围会重叠，需要手动迁移。
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from listening_ripples.config import settings
+from listening_ripples.models.posts import MonitoredPost, partition_step, partition_window
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{8})$")
+# 事务级 advisory lock 的键，多个进程同时启动时串行化分区的创建与删除
+_PARTITION_LOCK_KEY = 730_002
+# lock_timeout 超时的 SQLSTATE（lock_not_available）
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+def partition_name(start: date, table: str = MonitoredPost.__tablename__) -> str:
+    """分区表名，例如 monitored_post_p20261019（按周分区时为周一的日期）"""
+    return f"{table}_p{start:%Y%m%d}"
+
+
+class PostPartitionMaintainer:
+    """监测帖子分区维护器"""
+
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            interval: str = settings.POST_PARTITION_INTERVAL,
+            precreate: int = settings.POST_PARTITION_PRECREATE,
+            retention_days: int = settings.POST_RETENTION_DAYS,
+            retention_mode: str = settings.POST_RETENTION_MODE,
+            table: str = MonitoredPost.__tablename__,
+            lock_timeout_ms: int = settings.POST_PARTITION_LOCK_TIMEOUT_MS,
+            lock_retries: int = settings.POST_PARTITION_LOCK_RETRIES,
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.precreate = precreate
+        self.retention_days = retention_days
+        self.retention_mode = retention_mode
+        self.table = table
+        self.lock_timeout_ms = lock_timeout_ms
+        self.lock_retries = lock_retries
+
+    async def list_partitions(self) -> Dict[str, date]:
+        """列出当前挂在父表下的分区及其起始日期"""
+        query = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        )
+        async with self.engine.connect() as conn:
+            result = await conn.execute(query, {"table": self.table})
+            names = result.scalars().all()
+
+        partitions = {}
+        for name in names:
+            match = _PARTITION_SUFFIX.search(name)
+            if match:
+                partitions[name] = datetime.strptime(match.group(1), "%Y%m%d").date()
+        return partitions
+
+    def desired_partitions(self, today: date) -> List[date]:
+        """保留期起点到预创建终点之间每个分区的起始日期"""
+        window_start, window_end = partition_window(
+            today, self.interval, self.precreate, self.retention_days
+        )
+        step = partition_step(self.interval)
+        starts = []
+        current = window_start.date()
+        while current < window_end.date():
+            starts.append(current)
+            current += step
+        return starts
+
+    async def _lock(self, conn) -> None:
+        # advisory lock 在进程之间串行化维护任务；lock_timeout 只作用于本事务随后的 DDL
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+        await conn.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+
+    async def _retry_on_lock_timeout(self, action, *args):
+        for attempt in range(1, self.lock_retries + 1):
+            try:
+                return await action(*args)
+            except OperationalError as exc:
+                if getattr(exc.orig, "sqlstate", None) != _LOCK_NOT_AVAILABLE or attempt == self.lock_retries:
+                    raise
+                logger.warning(
+                    "lock timeout on %s during partition maintenance (attempt %d), retrying",
+                    self.table, attempt,
+                )
+                await asyncio.sleep(attempt)
+
+    async def create_partition(self, start: date) -> str:
+        """创建 [start, start + step) 的分区"""
+        name = partition_name(start, self.table)
+        end = start + partition_step(self.interval)
+        # 每个分区单独一个事务，缩短父表上的锁持有时间
+        async with self.engine.begin() as conn:
+            await self._lock(conn)
+            await conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{self.table}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+        return name
+
+    async def remove_partition(self, name: str) -> None:
+        """按保留策略删除或分离过期分区"""
+        async with self.engine.begin() as conn:
+            await self._lock(conn)
+            # 其他进程可能已经处理过这个分区
+            attached = await conn.execute(text(
+                "SELECT 1 FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE child.relname = :name"
+            ), {"name": name})
+            if attached.first() is None:
+                return
+            if self.retention_mode == "detach":
+                await conn.execute(text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"'))
+            else:
+                await conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+
+    async def run_once(self, today: Optional[date] = None) -> Dict[str, List[str]]:
+        """执行一轮维护，返回本轮创建和移除的分区"""
+        today = today or datetime.utcnow().date()
+        existing = await self.list_partitions()
+        desired = self.desired_partitions(today)
+
+        created = []
+        for start in desired:
+            if partition_name(start, self.table) not in existing:
+                created.append(await self._retry_on_lock_timeout(self.create_partition, start))
+
+        removed = []
+        oldest = desired[0]
+        for name, start in sorted(existing.items(), key=lambda item: item[1]):
+            if start < oldest:
+                await self._retry_on_lock_timeout(self.remove_partition, name)
+                removed.append(name)
+
+        if created or removed:
+            logger.info(
+                "post partitions maintained: created=%s %s=%s",
+                created, self.retention_mode, removed,
+            )
+        return {"created": created, "removed": removed}
+
+    async def run_forever(self, interval_seconds: int = settings.POST_PARTITION_MAINTENANCE_SECONDS) -> None:
+        """后台循环执行维护任务"""
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("post partition maintenance failed")
+            await asyncio.sleep(interval_seconds)
+
+
+async def _benchmark(engine: AsyncEngine, days: int = 30, rows_per_day: int = 100_000, queries: int = 200) -> None:
+    """对比分区表与单表的写入速率和按天范围查询延迟"""
+    import random
+    import time
+
+    base = date(2026, 1, 1)
+    batch_size = 5_000
+    tables = {"bench_post_single": "", "bench_post_partitioned": " PARTITION BY RANGE (published_at)"}
+
+    async with engine.begin() as conn:
+        for table, partition_by in tables.items():
+            await conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+            await conn.execute(text(
+                f"CREATE TABLE {table} (id bigserial, published_at timestamp NOT NULL, "
+                f"source varchar(64) NOT NULL, content text NOT NULL, "
+                f"PRIMARY KEY (id, published_at)){partition_by}"
+            ))
+            await conn.execute(text(f"CREATE INDEX ON {table} (published_at)"))
+        for offset in range(days):
+            start = base + timedelta(days=offset)
+            await conn.execute(text(
+                f"CREATE TABLE bench_post_partitioned_p{start:%Y%m%d} PARTITION OF bench_post_partitioned "
+                f"FOR VALUES FROM ('{start}') TO ('{start + timedelta(days=1)}')"
+            ))
+
+    rng = random.Random(0)
+    try:
+        for table in tables:
+            insert = text(f"INSERT INTO {table} (published_at, source, content) VALUES (:published_at, :source, :content)")
+            started = time.perf_counter()
+            async with engine.begin() as conn:
+                for offset in range(days):
+                    day_start = datetime.combine(base + timedelta(days=offset), datetime.min.time())
+                    for _ in range(0, rows_per_day, batch_size):
+                        await conn.execute(insert, [
+                            {
+                                "published_at": day_start + timedelta(seconds=rng.randrange(86400)),
+                                "source": "bench",
+                                "content": "x" * 200,
+                            }
+                            for _ in range(batch_size)
+                        ])
+            elapsed = time.perf_counter() - started
+            print(f"{table}: ingest {days * rows_per_day / elapsed:,.0f} rows/s")
+
+            async with engine.begin() as conn:
+                await conn.execute(text(f"ANALYZE {table}"))
+            count = text(f"SELECT count(*) FROM {table} WHERE published_at >= :start AND published_at < :end")
+            timings = []
+            async with engine.connect() as conn:
+                for _ in range(queries):
+                    start = datetime.combine(base + timedelta(days=rng.randrange(days)), datetime.min.time())
+                    t0 = time.perf_counter()
+                    await conn.execute(count, {"start": start, "end": start + timedelta(days=1)})
+                    timings.append(time.perf_counter() - t0)
+            timings.sort()
+            print(f"{table}: 1-day range query p50={timings[len(timings) // 2] * 1e3:.1f}ms "
+                  f"p95={timings[int(len(timings) * 0.95)] * 1e3:.1f}ms")
+    finally:
+        async with engine.begin() as conn:
+            for table in tables:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+
+
+if __name__ == "__main__":
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    asyncio.run(_benchmark(create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))))
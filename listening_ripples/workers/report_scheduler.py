@@ -0,0 +1,71 @@
+"""
+舆情简报后台任务。
+
+每轮先把新入库的帖子增量汇总进各租户的汇总表，再以有限并发
+（REPORT_RENDER_CONCURRENCY）重新渲染输入已变化的日报/周报。
+接口读取报表时只需按主键读取一行 rendered_report。
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from listening_ripples.config import settings
+from listening_ripples.reports.crud import ReportCRUD
+
+logger = logging.getLogger(__name__)
+
+
+class ReportScheduler:
+    """舆情简报调度器"""
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession],
+            concurrency: int = settings.REPORT_RENDER_CONCURRENCY,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+
+    async def _render(self, semaphore: asyncio.Semaphore, tenant_id, period, period_start, version) -> None:
+        async with semaphore:
+            async with self.session_factory() as db:
+                await ReportCRUD.render_report(db, tenant_id, period, period_start, version)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """执行一轮汇总与渲染，返回成功渲染的报表数；其他进程正在执行时跳过本轮"""
+        now = now or datetime.utcnow()
+        async with self.session_factory() as db:
+            touched = await ReportCRUD.fold_new_posts(db)
+            if touched is None:
+                logger.debug("report fold running in another process, skipping")
+                return 0
+            due = await ReportCRUD.get_due_reports(db, now.date())
+        tenants = {tenant for tenant, _ in touched}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._render(semaphore, *item) for item in due),
+            return_exceptions=True,
+        )
+        rendered = 0
+        for item, result in zip(due, results):
+            if isinstance(result, Exception):
+                logger.error("render report %s failed: %r", item[:3], result)
+            else:
+                rendered += 1
+        if tenants or due:
+            logger.info("reports refreshed: %d tenants folded, %d/%d rendered", len(tenants), rendered, len(due))
+        return rendered
+
+    async def run_forever(self, interval_seconds: int = settings.REPORT_REFRESH_SECONDS) -> None:
+        """后台循环执行"""
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("report refresh failed")
+            await asyncio.sleep(interval_seconds)
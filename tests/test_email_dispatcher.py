@@ -0,0 +1,171 @@
+import asyncio
+import socket
+from email import message_from_bytes, policy
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from listening_ripples.config import settings
+from listening_ripples.workers.email_dispatcher import NotificationDispatcher, SMTPConnectionPool
+
+
+class _RecordingHandler:
+    """记录收到的邮件；flaky 收件人返回 451，unknown 收件人在 RCPT 阶段返回 550"""
+
+    def __init__(self):
+        self.delivered = []
+        self.data_attempts = 0
+        self.rcpt_attempts = 0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.rcpt_attempts += 1
+        if address.startswith("unknown@"):
+            return "550 no such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.data_attempts += 1
+        if any(rcpt.startswith("flaky@") for rcpt in envelope.rcpt_tos):
+            return "451 try again later"
+        message = message_from_bytes(envelope.content, policy=policy.default)
+        self.delivered.append((id(session), envelope.rcpt_tos[0], message["Subject"]))
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", port)
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_SSL", False)
+    monkeypatch.setattr(settings, "SMTP_USER", None)
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", None)
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "alerts@example.com")
+    yield handler
+    controller.stop()
+
+
+def _dispatcher(**kwargs):
+    kwargs.setdefault("pool", SMTPConnectionPool(size=2))
+    kwargs.setdefault("retry_base_seconds", 0.01)
+    return NotificationDispatcher(**kwargs)
+
+
+async def _wait_until(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_pooled_delivery_reuses_connections(smtp):
+    async def main():
+        dispatcher = _dispatcher()
+        dispatcher.start()
+        for i in range(20):
+            message = dispatcher.build_message(f"user{i}@example.com", f"alert {i}", "body")
+            assert dispatcher.enqueue_message(message)
+        await dispatcher._outbox.join()
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert dispatcher.sent_count == 20
+    assert len(smtp.delivered) == 20
+    assert len({session for session, _, _ in smtp.delivered}) <= 2
+
+
+def test_first_alert_sent_immediately_then_coalesced(smtp):
+    async def main():
+        dispatcher = _dispatcher(coalesce_seconds=0.3)
+        dispatcher.start()
+        for i in range(5):
+            dispatcher.enqueue_alert("ops@example.com", f"alert {i}", "body")
+        # 第一条不等合并窗口
+        await _wait_until(lambda: len(smtp.delivered) == 1, timeout=0.25)
+        await _wait_until(lambda: len(smtp.delivered) == 2)
+        await dispatcher.stop()
+
+    asyncio.run(main())
+    subjects = [subject for _, _, subject in smtp.delivered]
+    assert subjects[0] == "alert 0"
+    assert subjects[1].endswith("4 条新告警")
+
+
+def test_transient_failures_retry_then_give_up(smtp):
+    async def main():
+        dispatcher = _dispatcher(max_retries=2)
+        dispatcher.start()
+        dispatcher.enqueue_message(dispatcher.build_message("flaky@example.com", "flaky", "body"))
+        await _wait_until(lambda: dispatcher.dropped_count == 1)
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert smtp.data_attempts == 3
+    assert dispatcher.sent_count == 0
+
+
+def test_permanent_failure_is_not_retried(smtp):
+    async def main():
+        dispatcher = _dispatcher(max_retries=3)
+        dispatcher.start()
+        dispatcher.enqueue_message(dispatcher.build_message("unknown@example.com", "lost", "body"))
+        await _wait_until(lambda: dispatcher.dropped_count == 1)
+        await asyncio.sleep(0.1)
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert smtp.rcpt_attempts == 1
+    assert dispatcher.dropped_count == 1
+
+
+def test_worker_survives_unexpected_errors(smtp):
+    async def main():
+        dispatcher = _dispatcher(pool=SMTPConnectionPool(size=1))
+        real_send = dispatcher.pool.send
+        calls = []
+
+        async def broken_once(message):
+            calls.append(message["To"])
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            await real_send(message)
+
+        dispatcher.pool.send = broken_once
+        dispatcher.start()
+        dispatcher.enqueue_message(dispatcher.build_message("a@example.com", "first", "body"))
+        dispatcher.enqueue_message(dispatcher.build_message("b@example.com", "second", "body"))
+        await dispatcher._outbox.join()
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert dispatcher.dropped_count == 1
+    assert [rcpt for _, rcpt, _ in smtp.delivered] == ["b@example.com"]
+
+
+def test_invalid_or_disabled_addresses_are_not_queued(smtp, monkeypatch):
+    async def main():
+        dispatcher = _dispatcher()
+        dispatcher.start()
+        assert not dispatcher.enqueue_message(dispatcher.build_message("not-an-address", "x", "body"))
+        dispatcher.enqueue_alert("", "x", "body")
+        assert dispatcher.dropped_count == 2
+
+        monkeypatch.setattr(settings, "SMTP_HOST", None)
+        assert not dispatcher.enqueue_message(dispatcher.build_message("user@example.com", "x", "body"))
+        assert dispatcher.dropped_count == 2
+        assert dispatcher._outbox.qsize() == 0
+        await dispatcher.stop()
+
+    asyncio.run(main())
+    assert smtp.delivered == []
@@ -0,0 +1,139 @@
+import asyncio
+import socket
+
+from listening_ripples.workers.fetcher import SourceFetcher, _serve_stand_in
+
+
+def _fetcher(**kwargs):
+    kwargs.setdefault("per_host_rate", 1000.0)
+    kwargs.setdefault("min_interval", 0.05)
+    kwargs.setdefault("max_interval", 0.8)
+    return SourceFetcher(**kwargs)
+
+
+def _record_intervals(fetcher, on_reschedule=None):
+    """记录每次重新调度后的 (是否有变化, 间隔)"""
+    history = []
+    original = fetcher._reschedule
+
+    def reschedule(source, changed):
+        original(source, changed)
+        history.append((changed, source.interval))
+        if on_reschedule:
+            on_reschedule(len(history))
+
+    fetcher._reschedule = reschedule
+    return history
+
+
+async def _wait_until(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _run(fetcher, body):
+    task = asyncio.create_task(fetcher.run())
+    try:
+        await body()
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await fetcher.close()
+
+
+def test_second_poll_is_304():
+    async def main():
+        state = {}
+        server = await _serve_stand_in(state=state)
+        port = server.sockets[0].getsockname()[1]
+        fetcher = _fetcher()
+        fetcher.add_source(f"http://127.0.0.1:{port}/feed")
+
+        async def body():
+            await _wait_until(lambda: state["requests"] >= 2)
+
+        async with server:
+            await _run(fetcher, body)
+        assert state["not_modified"] >= 1
+        assert fetcher.results.qsize() == 1
+        assert fetcher.results.get_nowait().status_code == 200
+
+    asyncio.run(main())
+
+
+def test_interval_doubles_when_unchanged_and_halves_on_change():
+    async def main():
+        state = {}
+        server = await _serve_stand_in(state=state)
+        port = server.sockets[0].getsockname()[1]
+        fetcher = _fetcher()
+
+        def bump(polls):
+            # 第二次轮询（304）之后信源更新
+            if polls == 2:
+                state["version"] = 2
+
+        history = _record_intervals(fetcher, bump)
+        fetcher.add_source(f"http://127.0.0.1:{port}/feed", interval=0.2)
+
+        async def body():
+            await _wait_until(lambda: len(history) >= 3)
+
+        async with server:
+            await _run(fetcher, body)
+        assert history[:3] == [(True, 0.1), (False, 0.2), (True, 0.1)]
+        assert fetcher.results.qsize() == 2
+
+    asyncio.run(main())
+
+
+def test_errors_back_off_and_keep_source_scheduled():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    async def main():
+        fetcher = _fetcher()
+        history = _record_intervals(fetcher)
+        source = fetcher.add_source(f"http://127.0.0.1:{port}/feed")
+
+        async def body():
+            await _wait_until(lambda: len(history) >= 3)
+
+        await _run(fetcher, body)
+        assert history[:3] == [(False, 0.1), (False, 0.2), (False, 0.4)]
+        assert source.error_count >= 3
+        assert any(url == source.url for _, _, url in fetcher._schedule)
+
+    asyncio.run(main())
+
+
+def test_unexpected_exception_keeps_source_scheduled():
+    async def main():
+        state = {}
+        server = await _serve_stand_in(state=state)
+        port = server.sockets[0].getsockname()[1]
+        fetcher = _fetcher()
+        real_fetch = fetcher.fetch
+        calls = []
+
+        async def flaky_fetch(source):
+            calls.append(source.url)
+            if len(calls) == 1:
+                raise ValueError("unexpected")
+            return await real_fetch(source)
+
+        fetcher.fetch = flaky_fetch
+        source = fetcher.add_source(f"http://127.0.0.1:{port}/feed")
+
+        async def body():
+            await _wait_until(lambda: fetcher.results.qsize() >= 1)
+
+        async with server:
+            await _run(fetcher, body)
+        assert source.error_count == 0
+        assert len(calls) >= 2
+
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from listening_ripples.core import PostBatch, PostBatchBuilder
+
+
+def _post(i, **overrides):
+    post = {
+        "tenant_id": i % 3 + 1,
+        "source": "weibo",
+        "source_post_id": f"{i:06d}",
+        "published_at": datetime(2026, 10, 19) + timedelta(minutes=i),
+        "author": f"作者{i}" if i % 2 else None,
+        "title": None,
+        "content": f"第 {i} 条帖子内容 \U0001f600",
+        "url": f"https://example.com/p/{i}",
+        "sentiment_score": i / 10 - 1 if i % 4 else None,
+        "topic_id": i % 5 if i % 3 else None,
+        "share_count": i * 7,
+    }
+    post.update(overrides)
+    return post
+
+
+@pytest.fixture
+def posts():
+    return [_post(i) for i in range(50)]
+
+
+def test_rows_round_trip(posts):
+    batch = PostBatch.from_posts(posts)
+    assert len(batch) == 50
+    assert batch.to_rows() == [{key: post[key] for key in batch[0]} for post in posts]
+    assert batch[-1]["source_post_id"] == "000049"
+
+
+def test_serialization_round_trip(posts):
+    batch = PostBatch.from_posts(posts)
+    restored = PostBatch.from_bytes(batch.to_bytes())
+    assert restored.to_rows() == batch.to_rows()
+
+
+def test_slice_is_zero_copy_and_serializes(posts):
+    batch = PostBatch.from_posts(posts)
+    part = batch[10:20]
+    assert part.to_rows() == batch.to_rows()[10:20]
+    assert part.text_column("content").data.obj is batch.text_column("content").data.obj
+    assert PostBatch.from_bytes(part.to_bytes()).to_rows() == part.to_rows()
+    assert len(batch[60:]) == 0
+
+
+def test_numeric_columns_are_typed_buffers(posts):
+    batch = PostBatch.from_posts(posts)
+    assert batch.column("share_count").format == "q"
+    assert batch.column("share_count").tolist() == [post["share_count"] for post in posts]
+
+
+def test_aware_timestamp_stored_as_utc():
+    batch = PostBatch.from_posts([_post(0, published_at=datetime(2026, 10, 19, 8, tzinfo=timezone(timedelta(hours=8))))])
+    assert batch[0]["published_at"] == datetime(2026, 10, 19, 0, 0)
+
+
+@pytest.mark.parametrize("bad", [{"content": None}, {"published_at": "not a datetime"}, {"tenant_id": 2**40}])
+def test_failed_append_keeps_builder_aligned(bad):
+    builder = PostBatchBuilder()
+    builder.append(_post(0))
+    with pytest.raises((ValueError, TypeError, OverflowError)):
+        builder.append(_post(1, **bad))
+    builder.append(_post(2))
+    batch = builder.build()
+    assert len(batch) == 2
+    assert [row["source_post_id"] for row in batch] == ["000000", "000002"]
+    assert PostBatch.from_bytes(batch.to_bytes()).to_rows() == batch.to_rows()
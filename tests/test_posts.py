@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from listening_ripples.posts.schemas import PostCreate
+from listening_ripples.workers.post_partitions import PostPartitionMaintainer
+
+
+def _post(published_at):
+    return PostCreate(tenant_id=1, source="weibo", source_post_id="1", published_at=published_at, content="x")
+
+
+def test_published_at_with_offset_becomes_naive_utc():
+    assert _post("2026-10-19T08:00:00+08:00").published_at == datetime(2026, 10, 19, 0, 0)
+
+
+def test_naive_published_at_is_kept():
+    assert _post(datetime(2026, 10, 19, 8, 0)).published_at == datetime(2026, 10, 19, 8, 0)
+
+
+class _DBError(Exception):
+    def __init__(self, sqlstate):
+        self.sqlstate = sqlstate
+
+
+def _failing(sqlstate, failures):
+    calls = []
+
+    async def action(name):
+        calls.append(name)
+        if len(calls) <= failures:
+            raise OperationalError("ALTER TABLE", {}, _DBError(sqlstate))
+        return name
+
+    return action, calls
+
+
+def test_partition_ddl_retries_lock_timeouts(monkeypatch):
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    maintainer = PostPartitionMaintainer(engine=None, lock_retries=3)
+
+    action, calls = _failing("55P03", failures=2)
+    assert asyncio.run(maintainer._retry_on_lock_timeout(action, "p")) == "p"
+    assert len(calls) == 3
+
+    action, calls = _failing("55P03", failures=3)
+    with pytest.raises(OperationalError):
+        asyncio.run(maintainer._retry_on_lock_timeout(action, "p"))
+
+    # 其他数据库错误不重试
+    action, calls = _failing("42P01", failures=1)
+    with pytest.raises(OperationalError):
+        asyncio.run(maintainer._retry_on_lock_timeout(action, "p"))
+    assert len(calls) == 1
@@ -0,0 +1,80 @@
+import pytest
+
+from listening_ripples.utilities.dictionary import DictionaryTrie, compile_entries
+from listening_ripples.utilities.text import Segmenter, TextNormalizer, TextPipeline
+
+
+@pytest.fixture
+def normalizer():
+    return TextNormalizer({ord("個"): "个", ord("們"): "们"})
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    path = tmp_path / "dict.bin"
+    compile_entries([("北京", 100), ("北京大学", 50), ("大学", 80), ("学生", 60), ("食品安全", 30)], str(path))
+    return DictionaryTrie(str(path))
+
+
+def test_normalize_folds_width_case_and_traditional(normalizer):
+    assert normalizer.normalize("ＡＢＣ１２３　我們 個") == "abc123 我们 个"
+
+
+def test_mention_without_delimiter_keeps_content(normalizer):
+    text = "@张三今天在北京发布了一条关于食品安全的重要消息大家快看"
+    assert normalizer.normalize(text) == text[1:]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("@张三 你好", "你好"),
+    ("你好@李四：在吗", "你好 :在吗"),
+    ("@alice, hi", ", hi"),
+])
+def test_mention_ends_at_whitespace_or_punctuation(normalizer, text, expected):
+    assert normalizer.normalize(text) == expected
+
+
+def test_email_is_not_a_mention(normalizer):
+    assert normalizer.normalize("联系 foo@bar.com") == "联系 foo@bar.com"
+
+
+def test_url_does_not_swallow_trailing_punctuation(normalizer):
+    assert normalizer.normalize("看这里https://t.cn/abc，@张三 你好") == "看这里 , 你好"
+    assert normalizer.normalize("(https://a.b/c?x=1). ok") == "( ). ok"
+
+
+def test_normalize_cache_is_byte_bounded():
+    normalizer = TextNormalizer(cache_bytes=64 * 1024)
+    for i in range(2000):
+        normalizer.normalize(f"帖子 {i} " * 10)
+    assert normalizer.normalize.current_bytes <= 64 * 1024
+    long_text = "长" * 10_000
+    normalizer.normalize(long_text)
+    assert long_text not in normalizer.normalize._data
+
+
+def test_dictionary_round_trip(dictionary):
+    assert "北京大学" in dictionary
+    assert "北京" in dictionary
+    assert "北" not in dictionary
+    assert "清华" not in dictionary
+    node = dictionary.child(dictionary.child(0, "北"), "京")
+    assert dictionary.log_prob(node) is not None
+    assert dictionary.child(node, "x") == -1
+
+
+def test_segmenter_max_probability_path(dictionary):
+    segmenter = Segmenter(dictionary)
+    assert segmenter.cut("北京大学生") == ["北京大学", "生"]
+    assert segmenter.cut("在北京学生") == ["在", "北京", "学生"]
+    assert segmenter.cut("食品安全 hello 2026 \U0001f600") == ["食品安全", "hello", "2026", "\U0001f600"]
+
+
+def test_segmenter_without_dictionary_splits_characters():
+    assert Segmenter().cut("你好 ok") == ["你", "好", "ok"]
+
+
+def test_pipeline_tokenize(dictionary, normalizer):
+    pipeline = TextPipeline(normalizer, Segmenter(dictionary))
+    assert pipeline.tokenize("@记者 北京https://t.cn/x，食品安全") == ["北京", "食品安全"]
+    assert pipeline.tokenize_batch(["北京", "北京"]) == [["北京"], ["北京"]]
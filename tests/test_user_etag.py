@@ -0,0 +1,103 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from listening_ripples.users import api as user_api
+from listening_ripples.users.crud import UserCRUD
+from listening_ripples.users.dependencies import get_current_active_user, get_db
+
+
+def _user(user_id, updated_at=datetime(2026, 10, 19, 8, 0)):
+    return SimpleNamespace(
+        id=user_id,
+        email=f"user{user_id}@example.com",
+        name=f"user{user_id}",
+        phone_number=None,
+        bio=None,
+        is_active=True,
+        login_count=0,
+        last_login_at=None,
+        created_at=datetime(2026, 1, 1),
+        updated_at=updated_at,
+    )
+
+
+@pytest.fixture
+def users(monkeypatch):
+    users = {1: _user(1), 2: _user(2)}
+    calls = {"get_users": 0}
+
+    async def get_user_by_id(db, user_id):
+        return users.get(user_id)
+
+    async def get_users(db, skip=0, limit=100, active_only=True):
+        calls["get_users"] += 1
+        return sorted(users.values(), key=lambda u: u.id)[skip:skip + limit]
+
+    async def get_user_versions(db, skip=0, limit=100, active_only=True):
+        return [(u.id, u.updated_at) for u in sorted(users.values(), key=lambda u: u.id)[skip:skip + limit]]
+
+    monkeypatch.setattr(UserCRUD, "get_user_by_id", staticmethod(get_user_by_id))
+    monkeypatch.setattr(UserCRUD, "get_users", staticmethod(get_users))
+    monkeypatch.setattr(UserCRUD, "get_user_versions", staticmethod(get_user_versions))
+    return SimpleNamespace(by_id=users, calls=calls)
+
+
+@pytest.fixture
+def client(users):
+    app = FastAPI()
+    app.include_router(user_api.router)
+
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_db] = no_db
+    app.dependency_overrides[get_current_active_user] = lambda: users.by_id[1]
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/users/me", "/users/2", "/users/"])
+def test_etag_and_304(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    not_modified = client.get(path, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    assert client.get(path, headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_me_varies_on_authorization(client):
+    assert "authorization" in client.get("/users/me").headers["vary"].lower()
+    etag = client.get("/users/me").headers["etag"]
+    response = client.get("/users/me", headers={"If-None-Match": etag})
+    assert "authorization" in response.headers["vary"].lower()
+
+
+def test_update_changes_etag(client, users):
+    etag = client.get("/users/2").headers["etag"]
+    users.by_id[2].updated_at = datetime(2026, 10, 19, 9, 0)
+    response = client.get("/users/2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_list_304_skips_full_query(client, users):
+    etag = client.get("/users/", params={"limit": 10}).headers["etag"]
+    before = users.calls["get_users"]
+    assert client.get("/users/", params={"limit": 10}, headers={"If-None-Match": etag}).status_code == 304
+    assert users.calls["get_users"] == before
+    # 不同分页参数的 ETag 不同
+    assert client.get("/users/", params={"limit": 1}).headers["etag"] != etag
+
+
+def test_missing_user_is_404(client):
+    assert client.get("/users/99").status_code == 404
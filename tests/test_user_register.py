@@ -0,0 +1,34 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from listening_ripples.config import settings
+from listening_ripples.users import api as user_api
+from listening_ripples.users.crud import UserCRUD
+from listening_ripples.users.dependencies import get_db
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def get_user_by_email(db, email):
+        return None
+
+    async def create_user(db, user):
+        raise AssertionError("superuser email must not be registered")
+
+    monkeypatch.setattr(UserCRUD, "get_user_by_email", staticmethod(get_user_by_email))
+    monkeypatch.setattr(UserCRUD, "create_user", staticmethod(create_user))
+    app = FastAPI()
+    app.include_router(user_api.router)
+
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_db] = no_db
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("email", [settings.FIRST_SUPERUSER, settings.FIRST_SUPERUSER.upper()])
+def test_register_rejects_superuser_email(client, email):
+    response = client.post("/users/register", json={"email": email, "password": "secret123"})
+    assert response.status_code == 400
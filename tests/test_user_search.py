@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from listening_ripples.models.users import User
+from listening_ripples.users.indexes import SEARCH_INDEX_NAMES, create_index_concurrently_ddl
+from listening_ripples.users.search import UserPrefixTrie
+
+
+def _user(user_id, name, email, phone=None, active=True):
+    return SimpleNamespace(id=user_id, name=name, email=email, phone_number=phone, is_active=active)
+
+
+def test_search_by_name_email_and_phone_prefix():
+    trie = UserPrefixTrie()
+    trie.load([_user(1, "Alice", "alice@example.com", "13800000000"), _user(2, "Bob", "bob@example.com")])
+    assert [item["id"] for item in trie.search("ali")] == [1]
+    assert [item["id"] for item in trie.search("1380")] == [1]
+    assert [item["id"] for item in trie.search("bob@")] == [2]
+    assert trie.search("carol") == []
+
+
+def test_notifications_from_other_processes_evict_users():
+    trie = UserPrefixTrie()
+    other = UserPrefixTrie()
+    trie.load([_user(1, "Alice", "alice@example.com"), _user(2, "Alina", "alina@example.com")])
+    # 其他进程改了用户 1；本进程自己发出的通知不影响本进程已刷新的条目
+    trie.apply_notification(other.notification_payload(1))
+    trie.apply_notification(trie.notification_payload(2))
+    trie.apply_notification("malformed")
+    assert [item["id"] for item in trie.search("ali")] == [2]
+
+
+def test_clear_marks_trie_cold():
+    trie = UserPrefixTrie()
+    trie.load([_user(1, "Alice", "alice@example.com")])
+    trie.clear()
+    assert not trie.warmed and len(trie) == 0
+    assert trie.search("ali") == []
+
+
+def test_warm_loads_once():
+    trie = UserPrefixTrie()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return [_user(1, "Alice", "alice@example.com")]
+
+    async def main():
+        await asyncio.gather(trie.warm(loader), trie.warm(loader))
+
+    asyncio.run(main())
+    assert calls == [1]
+    assert trie.warmed and len(trie) == 1
+
+
+def test_search_index_ddl_is_concurrent_and_idempotent():
+    indexes = {index.name: index for index in User.__table__.indexes}
+    assert set(SEARCH_INDEX_NAMES) <= set(indexes)
+    ddl = create_index_concurrently_ddl(indexes["ix_ab_user_name_trgm"], postgresql.dialect())
+    assert ddl == "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ab_user_name_trgm ON ab_user USING gin (name gin_trgm_ops)"